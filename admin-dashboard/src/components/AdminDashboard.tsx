@@ -25,7 +25,7 @@ import {
   Save,
   LogOut,
 } from "lucide-react";
-import { collegeApi, reviewApi, College, Review } from "../services/api";
+import { adminApi, collegeApi, reviewApi, College, Review } from "../services/api";
 import { User } from "../contexts/AuthContext";
 
 interface DashboardStats {
@@ -75,18 +75,14 @@ const AdminDashboard: React.FC<AdminDashboardProps> = ({ onLogout }) => {
     try {
       setLoading(true);
 
-      // Load initial data for stats
-      const [collegesRes, reviewsRes] = await Promise.all([
-        collegeApi.getAll(1, 1),
-        reviewApi.getAll(1, 1),
-      ]);
+      // Totals are computed server-side in one request
+      const { data } = await adminApi.getStats();
 
-      // Calculate basic stats from the response
       setStats({
-        totalColleges: collegesRes.data.total,
-        totalReviews: reviewsRes.data.total,
-        totalUsers: 0, // You'll need to add a users endpoint
-        averageRating: 4.2, // Calculate from actual data
+        totalColleges: data.total_colleges,
+        totalReviews: data.total_reviews,
+        totalUsers: data.total_users,
+        averageRating: data.average_rating,
       });
     } catch (error) {
       console.error("Error loading dashboard data:", error);
@@ -51,6 +51,26 @@ export interface Review {
   created_at: string;
 }
 
+export interface DailyActivity {
+  day: string;
+  new_users: number;
+  new_reviews: number;
+  new_likes: number;
+}
+
+export interface AdminStats {
+  total_colleges: number;
+  total_reviews: number;
+  total_users: number;
+  total_likes: number;
+  total_saves: number;
+  average_rating: number;
+  daily: DailyActivity[];
+  recent_reviews: Review[];
+  recent_colleges: College[];
+  generated_at: string;
+}
+
 // API Functions
 export const collegeApi = {
   getAll: (page = 1, limit = 20) => 
@@ -77,4 +97,9 @@ export const reviewApi = {
     api.delete(`/reviews/${id}`),
 };
 
+export const adminApi = {
+  getStats: () =>
+    api.get<AdminStats>('/admin/stats'),
+};
+
 export default api;
\ No newline at end of file
@@ -0,0 +1,186 @@
+"""
+Admin dashboard summary.
+
+GET /admin/stats returns the dashboard totals, daily rollups of new users,
+reviews and likes, and the latest reviews and colleges in one response. The
+summary is computed by compute_admin_stats() in four queries: one aggregate
+statement for the totals, one UNION ALL for the rollups, and two short
+index scans for the recent rows. Review totals come from the colleges'
+running rating_sum/rating_count, so they never scan reviews.
+
+The response is a stored snapshot at most ADMIN_STATS_REFRESH_SECONDS old.
+A background task recomputes it twice per period, so requests normally just
+read it and their cost doesn't grow with the tables. A request that finds
+it older than that, or missing (the refresher stalled, or has yet to run),
+recomputes it inline. With ADMIN_STATS_REFRESH_SECONDS=0 every request
+computes it.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from database import ReadSessionLocal
+from listings import college_response
+from models import College, Review, ReviewLike, SavedCollege, User
+from schemas import AdminStats, DailyActivity, ReviewResponse
+
+logger = logging.getLogger(__name__)
+
+ADMIN_STATS_REFRESH_SECONDS = float(os.getenv("ADMIN_STATS_REFRESH_SECONDS", 60))
+ADMIN_STATS_DAYS = int(os.getenv("ADMIN_STATS_DAYS", 30))
+ADMIN_STATS_RECENT = 5
+
+
+def totals_statement():
+    return select(
+        select(func.count(College.id)).scalar_subquery().label("total_colleges"),
+        select(func.coalesce(func.sum(College.rating_count), 0))
+        .scalar_subquery()
+        .label("total_reviews"),
+        select(func.coalesce(func.sum(College.rating_sum), 0.0))
+        .scalar_subquery()
+        .label("rating_sum"),
+        select(func.count(User.id)).scalar_subquery().label("total_users"),
+        select(func.count(ReviewLike.id)).scalar_subquery().label("total_likes"),
+        select(func.count(SavedCollege.id)).scalar_subquery().label("total_saves"),
+    )
+
+
+def daily_activity_statement(since: datetime):
+    """(kind, day, count) rows for everything created since the given time."""
+
+    def per_day(kind, created_at):
+        day = func.date(created_at)
+        return (
+            select(literal(kind).label("kind"), day.label("day"), func.count().label("count"))
+            .where(created_at >= since)
+            .group_by(day)
+        )
+
+    return union_all(
+        per_day("users", User.created_at),
+        per_day("reviews", Review.created_at),
+        per_day("likes", ReviewLike.created_at),
+    )
+
+
+def _as_date(value) -> date:
+    # SQLite returns date() as text
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def compute_admin_stats(db: Session, days: int = ADMIN_STATS_DAYS) -> AdminStats:
+    totals = db.execute(totals_statement()).one()
+
+    # Days are UTC, like the stored timestamps
+    first_day = datetime.utcnow().date() - timedelta(days=days - 1)
+    daily = {}
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        daily[day] = DailyActivity(day=day)
+    since = datetime.combine(first_day, datetime.min.time())
+    for kind, day, count in db.execute(daily_activity_statement(since)):
+        activity = daily.get(_as_date(day))
+        if activity is not None:
+            setattr(activity, f"new_{kind}", count)
+
+    recent_reviews = db.execute(
+        select(Review, College.name, User.username)
+        .join(College, Review.college_id == College.id)
+        .join(User, Review.user_id == User.id)
+        .order_by(Review.created_at.desc(), Review.id.desc())
+        .limit(ADMIN_STATS_RECENT)
+    ).all()
+    recent_colleges = db.execute(
+        select(College).order_by(College.id.desc()).limit(ADMIN_STATS_RECENT)
+    ).scalars()
+
+    return AdminStats(
+        total_colleges=totals.total_colleges,
+        total_reviews=totals.total_reviews,
+        total_users=totals.total_users,
+        total_likes=totals.total_likes,
+        total_saves=totals.total_saves,
+        average_rating=(
+            round(totals.rating_sum / totals.total_reviews, 2) if totals.total_reviews else 0.0
+        ),
+        daily=list(daily.values()),
+        recent_reviews=[
+            ReviewResponse(
+                id=review.id,
+                college_id=review.college_id,
+                user_id=review.user_id,
+                user_name=user_name,
+                rating=review.rating,
+                title=review.title,
+                content=review.content,
+                program=review.program,
+                graduation_year=review.graduation_year,
+                images=review.images or [],
+                is_verified=review.is_verified,
+                likes_count=review.likes_count,
+                college_name=college_name,
+                created_at=review.created_at,
+            )
+            for review, college_name, user_name in recent_reviews
+        ],
+        recent_colleges=[college_response(college, set()) for college in recent_colleges],
+        generated_at=datetime.now(),
+    )
+
+
+class AdminStatsSnapshot:
+    def __init__(self, max_age: float = ADMIN_STATS_REFRESH_SECONDS):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._stats: Optional[AdminStats] = None
+        self._computed_at = 0.0
+
+    def refresh(self, db: Session) -> AdminStats:
+        stats = compute_admin_stats(db)
+        with self._lock:
+            self._stats = stats
+            self._computed_at = time.monotonic()
+        return stats
+
+    def get(self, db: Session) -> AdminStats:
+        """The stored snapshot, or a fresh one if it is missing or max_age old."""
+        with self._lock:
+            stats = self._stats
+            fresh = time.monotonic() - self._computed_at < self.max_age
+        if stats is not None and fresh:
+            return stats
+        return self.refresh(db)
+
+
+admin_stats = AdminStatsSnapshot()
+
+
+def refresh_admin_stats():
+    db = ReadSessionLocal()
+    try:
+        admin_stats.refresh(db)
+    finally:
+        db.close()
+
+
+async def keep_admin_stats_fresh():
+    """
+    Recompute the snapshot twice per ADMIN_STATS_REFRESH_SECONDS (0 disables),
+    so it is replaced before requests would find it stale.
+    """
+    while ADMIN_STATS_REFRESH_SECONDS > 0:
+        try:
+            await run_in_threadpool(refresh_admin_stats)
+        except Exception:
+            logger.exception("Failed to refresh the admin stats")
+        await asyncio.sleep(ADMIN_STATS_REFRESH_SECONDS / 2)
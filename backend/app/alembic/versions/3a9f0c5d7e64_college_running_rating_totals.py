@@ -0,0 +1,44 @@
+"""College running rating totals
+
+Revision ID: 3a9f0c5d7e64
+Revises: e58a3c6f9b21
+Create Date: 2026-10-17 14:05:33.918257
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a9f0c5d7e64'
+down_revision = 'e58a3c6f9b21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'colleges',
+        sa.Column('rating_sum', sa.Float(), nullable=False, server_default='0'),
+    )
+    op.add_column(
+        'colleges',
+        sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.execute(
+        """
+        UPDATE colleges SET
+            rating_sum = coalesce((
+                SELECT sum(reviews.rating) FROM reviews
+                WHERE reviews.college_id = colleges.id
+            ), 0),
+            rating_count = (
+                SELECT count(*) FROM reviews WHERE reviews.college_id = colleges.id
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('colleges', 'rating_count')
+    op.drop_column('colleges', 'rating_sum')
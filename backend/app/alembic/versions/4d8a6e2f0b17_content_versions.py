@@ -0,0 +1,30 @@
+"""Content version counters
+
+Revision ID: 4d8a6e2f0b17
+Revises: 7b2e9d4c1f86
+Create Date: 2026-10-17 18:42:07.216934
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d8a6e2f0b17'
+down_revision = '7b2e9d4c1f86'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Rows are created by the first write that bumps them; missing reads as 0
+    op.create_table(
+        'content_versions',
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('key'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('content_versions')
@@ -0,0 +1,101 @@
+"""College filter facets
+
+Revision ID: 6f1d2b8e4a90
+Revises: 2583a86aacdc
+Create Date: 2026-10-17 09:12:41.503118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6f1d2b8e4a90'
+down_revision = '2583a86aacdc'
+branch_labels = None
+depends_on = None
+
+
+def _as_int(value):
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _derive_streams(meta, programs):
+    # Frozen copy of facets.derive_streams at the time of this migration
+    streams = {s.strip().lower() for s in (meta.get("streams") or []) if s and s.strip()}
+    if not streams:
+        prog = [p.lower() for p in (programs or []) if p]
+        if any("science" in p for p in prog):
+            streams.add("science")
+        if any("management" in p or "commerce" in p for p in prog):
+            streams.add("commerce")
+        if any("humanities" in p or "arts" in p for p in prog):
+            streams.add("humanities")
+    return streams
+
+
+def upgrade() -> None:
+    op.add_column('colleges', sa.Column('min_fee', sa.Integer(), nullable=True))
+    op.add_column('colleges', sa.Column('max_fee', sa.Integer(), nullable=True))
+    op.add_column('colleges', sa.Column('scholarships_available', sa.Boolean(), nullable=True))
+    op.create_index('ix_colleges_min_fee', 'colleges', ['min_fee'])
+    op.create_index('ix_colleges_max_fee', 'colleges', ['max_fee'])
+    op.create_index('ix_colleges_scholarships_available', 'colleges', ['scholarships_available'])
+
+    college_streams = op.create_table(
+        'college_streams',
+        sa.Column('college_id', sa.Integer(), nullable=False),
+        sa.Column('stream', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['college_id'], ['colleges.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('college_id', 'stream'),
+    )
+    op.create_index('ix_college_streams_stream', 'college_streams', ['stream', 'college_id'])
+
+    # Backfill the facets from the existing college_metadata/programs JSON
+    colleges = sa.table(
+        'colleges',
+        sa.column('id', sa.Integer),
+        sa.column('programs', sa.JSON),
+        sa.column('college_metadata', sa.JSON),
+        sa.column('min_fee', sa.Integer),
+        sa.column('max_fee', sa.Integer),
+        sa.column('scholarships_available', sa.Boolean),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(colleges.c.id, colleges.c.programs, colleges.c.college_metadata)
+    ).all()
+    stream_rows = []
+    for college_id, programs, meta in rows:
+        meta = meta or {}
+        bind.execute(
+            colleges.update()
+            .where(colleges.c.id == college_id)
+            .values(
+                min_fee=_as_int(meta.get("min_fee")),
+                max_fee=_as_int(meta.get("max_fee")),
+                scholarships_available=bool(meta.get("scholarships_available")),
+            )
+        )
+        stream_rows.extend(
+            {"college_id": college_id, "stream": stream}
+            for stream in sorted(_derive_streams(meta, programs))
+        )
+    if stream_rows:
+        op.bulk_insert(college_streams, stream_rows)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_college_streams_stream', table_name='college_streams')
+    op.drop_table('college_streams')
+    op.drop_index('ix_colleges_scholarships_available', table_name='colleges')
+    op.drop_index('ix_colleges_max_fee', table_name='colleges')
+    op.drop_index('ix_colleges_min_fee', table_name='colleges')
+    op.drop_column('colleges', 'scholarships_available')
+    op.drop_column('colleges', 'max_fee')
+    op.drop_column('colleges', 'min_fee')
@@ -0,0 +1,128 @@
+"""Review like and saved college constraints
+
+Revision ID: 7b2e9d4c1f86
+Revises: 3a9f0c5d7e64
+Create Date: 2026-10-17 15:21:40.552913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b2e9d4c1f86'
+down_revision = '3a9f0c5d7e64'
+branch_labels = None
+depends_on = None
+
+# On PostgreSQL the indexes are built CONCURRENTLY and then attached as
+# constraints, so likes and saves keep flowing while this runs. If a build is
+# interrupted it leaves an INVALID index behind; drop it and run again.
+
+
+def _review_id_foreign_key(bind):
+    for fk in sa.inspect(bind).get_foreign_keys('review_likes'):
+        if fk['referred_table'] == 'reviews':
+            return fk['name']
+    return None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # Races in the like/save toggles could insert the same pair twice; keep
+    # the oldest row so the unique indexes can build
+    op.execute(
+        """
+        UPDATE reviews SET likes_count = (
+            SELECT count(DISTINCT user_id) FROM review_likes
+            WHERE review_likes.review_id = reviews.id
+        )
+        WHERE id IN (
+            SELECT review_id FROM review_likes
+            GROUP BY review_id, user_id HAVING count(*) > 1
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM review_likes WHERE id NOT IN (
+            SELECT min(id) FROM review_likes GROUP BY review_id, user_id
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM saved_colleges WHERE id NOT IN (
+            SELECT min(id) FROM saved_colleges GROUP BY user_id, college_id
+        )
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        # Like toggle, liked flags and deleting a review's likes
+        op.create_index(
+            'uq_review_likes_review_user', 'review_likes', ['review_id', 'user_id'],
+            unique=True, postgresql_concurrently=True,
+        )
+        # Save toggle and saved flags
+        op.create_index(
+            'uq_saved_colleges_user_college', 'saved_colleges', ['user_id', 'college_id'],
+            unique=True, postgresql_concurrently=True,
+        )
+        # Deleting a college's saves
+        op.create_index(
+            'ix_saved_colleges_college', 'saved_colleges', ['college_id'],
+            postgresql_concurrently=True,
+        )
+
+    if bind.dialect.name != 'postgresql':
+        # SQLite keeps the unique indexes; its foreign keys aren't enforced
+        return
+
+    op.execute(
+        'ALTER TABLE review_likes ADD CONSTRAINT uq_review_likes_review_user '
+        'UNIQUE USING INDEX uq_review_likes_review_user'
+    )
+    op.execute(
+        'ALTER TABLE saved_colleges ADD CONSTRAINT uq_saved_colleges_user_college '
+        'UNIQUE USING INDEX uq_saved_colleges_user_college'
+    )
+
+    # Likes go with their review. NOT VALID + VALIDATE avoids holding the
+    # exclusive lock while existing rows are checked.
+    fk_name = _review_id_foreign_key(bind) or 'review_likes_review_id_fkey'
+    op.execute(
+        f'ALTER TABLE review_likes DROP CONSTRAINT IF EXISTS {fk_name}, '
+        f'ADD CONSTRAINT {fk_name} FOREIGN KEY (review_id) '
+        'REFERENCES reviews (id) ON DELETE CASCADE NOT VALID'
+    )
+    op.execute(f'ALTER TABLE review_likes VALIDATE CONSTRAINT {fk_name}')
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql':
+        fk_name = _review_id_foreign_key(bind) or 'review_likes_review_id_fkey'
+        op.execute(
+            f'ALTER TABLE review_likes DROP CONSTRAINT IF EXISTS {fk_name}, '
+            f'ADD CONSTRAINT {fk_name} FOREIGN KEY (review_id) '
+            'REFERENCES reviews (id) NOT VALID'
+        )
+        op.execute(f'ALTER TABLE review_likes VALIDATE CONSTRAINT {fk_name}')
+        # Dropping the constraints drops their indexes too
+        op.drop_constraint(
+            'uq_saved_colleges_user_college', 'saved_colleges', type_='unique'
+        )
+        op.drop_constraint('uq_review_likes_review_user', 'review_likes', type_='unique')
+        with op.get_context().autocommit_block():
+            op.drop_index(
+                'ix_saved_colleges_college', table_name='saved_colleges',
+                postgresql_concurrently=True,
+            )
+        return
+
+    op.drop_index('ix_saved_colleges_college', table_name='saved_colleges')
+    op.drop_index('uq_saved_colleges_user_college', table_name='saved_colleges')
+    op.drop_index('uq_review_likes_review_user', table_name='review_likes')
@@ -0,0 +1,66 @@
+"""College weighted score and sort indexes
+
+Revision ID: 9c4e7a1b3d52
+Revises: 6f1d2b8e4a90
+Create Date: 2026-10-17 10:03:18.220914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4e7a1b3d52'
+down_revision = '6f1d2b8e4a90'
+branch_labels = None
+depends_on = None
+
+WEIGHTED_PRIOR_M = 5
+
+
+def upgrade() -> None:
+    op.add_column('colleges', sa.Column('weighted_score', sa.Float(), nullable=True))
+
+    # Recompute the stored aggregates from reviews before scoring them
+    op.execute(
+        """
+        UPDATE colleges SET
+            total_reviews = (
+                SELECT count(*) FROM reviews WHERE reviews.college_id = colleges.id
+            ),
+            average_rating = coalesce((
+                SELECT round(CAST(avg(reviews.rating) AS NUMERIC), 1)
+                FROM reviews WHERE reviews.college_id = colleges.id
+            ), 0.0)
+        """
+    )
+    c_mean = op.get_bind().execute(
+        sa.text(
+            "SELECT avg(average_rating) FROM colleges WHERE total_reviews > 0"
+        )
+    ).scalar()
+    op.execute(
+        sa.text(
+            """
+            UPDATE colleges SET weighted_score =
+                (total_reviews * average_rating + :m * :c_mean) / (total_reviews + :m)
+            """
+        ).bindparams(m=WEIGHTED_PRIOR_M, c_mean=float(c_mean or 0.0))
+    )
+
+    op.create_index(
+        'ix_colleges_sort_highest', 'colleges', ['average_rating', 'total_reviews', 'id']
+    )
+    op.create_index(
+        'ix_colleges_sort_most', 'colleges', ['total_reviews', 'average_rating', 'id']
+    )
+    op.create_index(
+        'ix_colleges_sort_weighted', 'colleges', ['weighted_score', 'total_reviews', 'id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_colleges_sort_weighted', table_name='colleges')
+    op.drop_index('ix_colleges_sort_most', table_name='colleges')
+    op.drop_index('ix_colleges_sort_highest', table_name='colleges')
+    op.drop_column('colleges', 'weighted_score')
@@ -0,0 +1,38 @@
+"""Keyset pagination indexes
+
+Revision ID: d27b5f0e8c13
+Revises: 9c4e7a1b3d52
+Create Date: 2026-10-17 11:26:07.841356
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd27b5f0e8c13'
+down_revision = '9c4e7a1b3d52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_reviews_college_created', 'reviews', ['college_id', 'created_at', 'id']
+    )
+    op.create_index('ix_reviews_user_created', 'reviews', ['user_id', 'created_at', 'id'])
+    op.create_index('ix_reviews_created', 'reviews', ['created_at', 'id'])
+    op.create_index(
+        'ix_review_likes_user_created', 'review_likes', ['user_id', 'created_at', 'id']
+    )
+    op.create_index(
+        'ix_saved_colleges_user_created', 'saved_colleges', ['user_id', 'created_at', 'id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_saved_colleges_user_created', table_name='saved_colleges')
+    op.drop_index('ix_review_likes_user_created', table_name='review_likes')
+    op.drop_index('ix_reviews_created', table_name='reviews')
+    op.drop_index('ix_reviews_user_created', table_name='reviews')
+    op.drop_index('ix_reviews_college_created', table_name='reviews')
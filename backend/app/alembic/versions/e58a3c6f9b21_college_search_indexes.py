@@ -0,0 +1,50 @@
+"""College full-text and trigram search indexes
+
+Revision ID: e58a3c6f9b21
+Revises: d27b5f0e8c13
+Create Date: 2026-10-17 12:48:52.106734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e58a3c6f9b21'
+down_revision = 'd27b5f0e8c13'
+branch_labels = None
+depends_on = None
+
+# Must match search.search_document() exactly
+SEARCH_DOCUMENT = (
+    "to_tsvector('simple'::regconfig, "
+    "coalesce(name, '') || ' ' || coalesce(location, '') || ' ' || "
+    "coalesce(affiliation, '') || ' ' || coalesce(CAST(programs AS TEXT), ''))"
+)
+
+TRIGRAM_COLUMNS = ['name', 'location', 'city', 'state']
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute(
+        f'CREATE INDEX ix_colleges_search_document ON colleges USING gin ({SEARCH_DOCUMENT})'
+    )
+    # Trigram indexes serve both the fuzzy search and the city/state ILIKE filters
+    for column in TRIGRAM_COLUMNS:
+        op.execute(
+            f'CREATE INDEX ix_colleges_{column}_trgm ON colleges '
+            f'USING gin ({column} gin_trgm_ops)'
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for column in reversed(TRIGRAM_COLUMNS):
+        op.execute(f'DROP INDEX IF EXISTS ix_colleges_{column}_trgm')
+    op.execute('DROP INDEX IF EXISTS ix_colleges_search_document')
@@ -0,0 +1,183 @@
+"""
+Async versions of the hot read endpoints, mounted when DATABASE_ASYNC is set.
+
+They run on an AsyncSession over asyncpg, so a request waiting on PostgreSQL
+doesn't hold a threadpool thread. Statements and responses come from
+listings.py and match the sync handlers in main.py. The routes are registered
+before main.py's, and their :int path convertors keep /colleges/suggest on its
+own handler.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+
+from auth import get_current_principal_optional_async
+from httpcache import cache_headers, conditional_response, make_etag
+from listing_cache import listing_cache, listing_filters, listing_key, listing_response
+from replicas import get_async_read_db
+from listings import (
+    COLLEGE_REVIEW_ORDER,
+    college_list_response,
+    college_list_statement,
+    college_response,
+    college_review_key,
+    college_reviews_response,
+    college_reviews_statement,
+    college_reviews_version_statement,
+    college_version,
+    count_statement,
+    viewer_key,
+)
+from models import College
+from pagination import keyset_window, split_page
+from principals import Principal
+from profiling import ProfilingRoute
+from schemas import CollegeListResponse, CollegeResponse, ReviewListResponse
+from viewer import (
+    liked_review_ids_statement,
+    liked_reviews_version_statement,
+    saved_college_ids_statement,
+)
+
+router = APIRouter(route_class=ProfilingRoute)
+
+
+async def _saved_college_ids(db, user: Optional[Principal], college_ids) -> set:
+    college_ids = set(college_ids)
+    if user is None or not college_ids:
+        return set()
+    result = await db.execute(saved_college_ids_statement(user.id, college_ids))
+    return set(result.scalars())
+
+
+async def _liked_review_ids(db, user: Optional[Principal], review_ids) -> set:
+    review_ids = set(review_ids)
+    if user is None or not review_ids:
+        return set()
+    result = await db.execute(liked_review_ids_statement(user.id, review_ids))
+    return set(result.scalars())
+
+
+@router.get("/colleges", response_model=CollegeListResponse)
+async def get_colleges(
+    request: Request,
+    response: Response,
+    page: int = Query(1, ge=1),
+    limit: int = Query(10, ge=1, le=100),
+    search: Optional[str] = None,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    streams: Optional[str] = None,  # comma separated
+    min_fee: Optional[int] = None,
+    max_fee: Optional[int] = None,
+    scholarships: Optional[bool] = None,
+    sort: Optional[str] = None,  # 'highest' | 'most' | 'weighted'
+    db=Depends(get_async_read_db),
+    current_user: Optional[Principal] = Depends(get_current_principal_optional_async),
+):
+    filters = listing_filters(
+        search=search,
+        city=city,
+        state=state,
+        streams=streams,
+        min_fee=min_fee,
+        max_fee=max_fee,
+        scholarships=scholarships,
+        sort=sort,
+    )
+    key = listing_key(page=page, limit=limit, **filters)
+    cached = listing_cache.get(key)
+    if cached is None:
+        statement = college_list_statement(db.bind.dialect.name, **filters)
+
+        total = (await db.execute(count_statement(statement))).scalar_one()
+
+        offset = (page - 1) * limit
+        result = await db.execute(statement.offset(offset).limit(limit))
+        colleges = result.scalars().all()
+        cached = listing_cache.store(
+            key, college_list_response(colleges, set(), total, page, limit)
+        )
+
+    saved_ids = await _saved_college_ids(db, current_user, cached.college_ids)
+    etag = make_etag("colleges", cached.digest, viewer_key(current_user), sorted(saved_ids))
+    not_modified = conditional_response(request, response, etag, current_user is None)
+    if not_modified:
+        return not_modified
+    return listing_response(cached, saved_ids, cache_headers(etag, current_user is None))
+
+
+@router.get("/colleges/{college_id:int}", response_model=CollegeResponse)
+async def get_college(
+    college_id: int,
+    request: Request,
+    response: Response,
+    db=Depends(get_async_read_db),
+    current_user: Optional[Principal] = Depends(get_current_principal_optional_async),
+):
+    college = await db.get(College, college_id)
+    if not college:
+        raise HTTPException(status_code=404, detail="College not found")
+
+    saved_ids = await _saved_college_ids(db, current_user, [college.id])
+    etag = make_etag(
+        "college", college_version(college), viewer_key(current_user), college.id in saved_ids
+    )
+    not_modified = conditional_response(request, response, etag, current_user is None)
+    if not_modified:
+        return not_modified
+
+    return college_response(college, saved_ids)
+
+
+@router.get("/colleges/{college_id:int}/reviews", response_model=ReviewListResponse)
+async def get_college_reviews(
+    college_id: int,
+    request: Request,
+    response: Response,
+    page: int = Query(1, ge=1),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db=Depends(get_async_read_db),
+    current_user: Optional[Principal] = Depends(get_current_principal_optional_async),
+):
+    college = await db.get(College, college_id)
+    if not college:
+        raise HTTPException(status_code=404, detail="College not found")
+
+    result = await db.execute(college_reviews_version_statement(college_id))
+    version = result.scalar() or 0
+    viewer_version = None
+    if current_user is not None:
+        result = await db.execute(liked_reviews_version_statement(current_user.id))
+        viewer_version = tuple(result.one())
+    etag = make_etag(
+        "college_reviews",
+        college_version(college),
+        version,
+        viewer_key(current_user),
+        viewer_version,
+    )
+    not_modified = conditional_response(request, response, etag, current_user is None)
+    if not_modified:
+        return not_modified
+
+    statement = college_reviews_statement(college_id)
+    total = (await db.execute(count_statement(statement))).scalar_one()
+
+    window = keyset_window(
+        statement,
+        COLLEGE_REVIEW_ORDER,
+        limit=limit,
+        page=page,
+        cursor=cursor,
+        dialect_name=db.bind.dialect.name,
+    )
+    result = await db.execute(window)
+    reviews, next_cursor = split_page(result.scalars().all(), college_review_key, limit)
+
+    liked_ids = await _liked_review_ids(db, current_user, (r.id for r in reviews))
+    return college_reviews_response(
+        college, reviews, liked_ids, current_user, total, page, limit, next_cursor
+    )
@@ -2,20 +2,26 @@ import os
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_async_db, get_db
 from models import User
+from passwords import check_password, pwd_context
+from principals import Principal, principal_cache
 from schemas import TokenData
 
 # Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+# Comma-separated usernames allowed on the admin-only diagnostics endpoints
+ADMIN_USERNAMES = frozenset(
+    name.strip() for name in os.getenv("ADMIN_USERNAMES", "").split(",") if name.strip()
+)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 optional_security = HTTPBearer(auto_error=False)
 
@@ -51,51 +57,153 @@ def verify_token(token: str, credentials_exception):
     return token_data
 
 
+def token_subject(authorization: Optional[str]) -> Optional[str]:
+    """Username from a bearer Authorization header, if it carries a valid token."""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        payload = jwt.decode(authorization[7:], SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+
+def is_admin(username: Optional[str]) -> bool:
+    return username is not None and username in ADMIN_USERNAMES
+
+
 def get_user(db: Session, username: str):
     return db.query(User).filter(User.username == username).first()
 
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = get_user(db, username)
+async def authenticate_user(db: Session, username: str, password: str):
+    user = await run_in_threadpool(get_user, db, username)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    if not await check_password(password, user.hashed_password):
         return False
     return user
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-):
-    credentials_exception = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def resolve_principal(db: Session, username: str) -> Optional[Principal]:
+    principal = principal_cache.get(username)
+    if principal is None:
+        user = get_user(db, username)
+        if user is None:
+            return None
+        principal = Principal.from_user(user)
+        principal_cache.put(username, principal)
+    return principal
+
+
+# Most handlers only need the caller's id and username: they depend on the
+# principal, which is served from principal_cache without a DB round trip.
+# The sync dependencies are plain functions so FastAPI runs a cache miss's
+# lookup in the threadpool instead of blocking the event loop.
+def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> Principal:
+    credentials_exception = _credentials_exception()
     token_data = verify_token(credentials.credentials, credentials_exception)
-    user = get_user(db, username=token_data.username)
-    if user is None:
+    principal = resolve_principal(db, token_data.username)
+    if principal is None:
         raise credentials_exception
-    return user
+    return principal
 
 
-async def get_current_user_optional(
+def get_current_principal_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
     db: Session = Depends(get_db),
-) -> Optional[User]:
+) -> Optional[Principal]:
     if credentials is None:
         return None
     try:
-        token_data = verify_token(credentials.credentials, HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials"))
-        user = get_user(db, username=token_data.username)
-        return user
+        token_data = verify_token(credentials.credentials, _credentials_exception())
+        return resolve_principal(db, token_data.username)
     except Exception:
         return None
 
 
+async def get_current_active_principal(
+    current_user: Principal = Depends(get_current_principal),
+) -> Principal:
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
+
+async def get_current_admin_principal(
+    current_user: Principal = Depends(get_current_active_principal),
+) -> Principal:
+    if not is_admin(current_user.username):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
+
+
+# Handlers that read or modify the full profile load the User row
+def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    user = db.get(User, principal.id)
+    if user is None:
+        principal_cache.invalidate(principal.username)
+        raise _credentials_exception()
+    return user
+
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+
+# Async variants for the handlers in async_api.py
+async def get_user_async(db, username: str):
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalars().first()
+
+
+async def resolve_principal_async(db, username: str) -> Optional[Principal]:
+    principal = principal_cache.get(username)
+    if principal is None:
+        user = await get_user_async(db, username)
+        if user is None:
+            return None
+        principal = Principal.from_user(user)
+        principal_cache.put(username, principal)
+    return principal
+
+
+async def get_current_principal_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db=Depends(get_async_db),
+) -> Principal:
+    credentials_exception = _credentials_exception()
+    token_data = verify_token(credentials.credentials, credentials_exception)
+    principal = await resolve_principal_async(db, token_data.username)
+    if principal is None:
+        raise credentials_exception
+    return principal
+
+
+async def get_current_principal_optional_async(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db=Depends(get_async_db),
+) -> Optional[Principal]:
+    if credentials is None:
+        return None
+    try:
+        token_data = verify_token(credentials.credentials, _credentials_exception())
+        return await resolve_principal_async(db, token_data.username)
+    except Exception:
+        return None
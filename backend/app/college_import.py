@@ -0,0 +1,217 @@
+"""
+Bulk college import.
+
+POST /colleges/import takes CSV (with a header row) or NDJSON as the raw
+request body and reads it as a stream, so the upload is never held in
+memory. Rows are validated against CollegeCreate and written
+IMPORT_CHUNK_ROWS at a time: one multi-row INSERT ... RETURNING for the
+colleges and one for their stream facets, committed per chunk. A chunk that
+fails in the database is rolled back and its rows reported; the rest of the
+import carries on. A body that isn't valid UTF-8 can't be read past the bad
+byte: the rows before it are still written, and the error is reported
+against the row being read.
+
+CSV columns are CollegeCreate's fields. The list fields (images, programs,
+facilities) take a JSON array or ";"-separated values, college_metadata a
+JSON object, and empty cells are treated as missing. A row with more or fewer
+cells than the header is an error. Errors name rows by their 1-based record
+number, not counting the CSV header.
+"""
+
+import codecs
+import csv
+import json
+import os
+from typing import AsyncIterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from facets import derive_streams, facet_columns
+from models import College, CollegeStream
+from ratings import prior_mean
+from schemas import CollegeCreate, CollegeImportError, CollegeImportResult
+
+IMPORT_CHUNK_ROWS = int(os.getenv("IMPORT_CHUNK_ROWS", 500))
+# Errors listed in the response; the failed count covers every row
+IMPORT_MAX_ERRORS = 1000
+
+LIST_FIELDS = {"images", "programs", "facilities"}
+OBJECT_FIELDS = {"college_metadata"}
+
+FORMATS = {"text/csv": "csv", "application/x-ndjson": "ndjson", "application/jsonl": "ndjson"}
+
+
+def import_format(content_type: Optional[str], format: Optional[str]) -> Optional[str]:
+    if format:
+        return format
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return FORMATS.get(media_type)
+
+
+async def text_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream into lines, keeping their line endings."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        try:
+            text = decoder.decode(chunk)
+        except UnicodeDecodeError as e:
+            # Hand on the complete lines before the bad byte, then give up
+            *lines, _ = (pending + e.object[: e.start].decode("utf-8-sig")).split("\n")
+            for line in lines:
+                yield line + "\n"
+            raise
+        # The last piece may be the start of a line still in flight
+        *lines, pending = (pending + text).split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def csv_records(lines: AsyncIterator[str]) -> AsyncIterator[object]:
+    header = None
+    record = ""
+    async for line in lines:
+        record += line
+        # An odd number of quotes means a quoted field continues on the next line
+        if record.count('"') % 2:
+            continue
+        row, record = next(csv.reader([record])), ""
+        if header is None:
+            header = [name.strip() for name in row]
+        elif not any(value.strip() for value in row):
+            continue
+        elif len(row) != len(header):
+            yield ValueError(f"expected {len(header)} cells, got {len(row)}")
+        else:
+            yield dict(zip(header, row))
+    if record:
+        yield ValueError("unterminated quoted field")
+
+
+async def ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[object]:
+    async for line in lines:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield e
+
+
+def _csv_value(field: str, value: str):
+    value = value.strip()
+    if not value:
+        return None
+    if field in LIST_FIELDS:
+        if value.startswith("["):
+            return json.loads(value)
+        return [item.strip() for item in value.split(";") if item.strip()]
+    if field in OBJECT_FIELDS:
+        return json.loads(value)
+    return value
+
+
+def parse_record(record, format: str) -> CollegeCreate:
+    """Validate one record; raises ValueError with the messages to report."""
+    if isinstance(record, Exception):
+        raise ValueError([f"unreadable {format} record: {record}"])
+    if not isinstance(record, dict):
+        raise ValueError(["expected a JSON object"])
+    if format == "csv":
+        try:
+            values = ((field, _csv_value(field, value)) for field, value in record.items())
+            record = {field: value for field, value in values if value is not None}
+        except ValueError as e:
+            raise ValueError([f"invalid JSON cell: {e}"])
+    try:
+        return CollegeCreate(**record)
+    except ValidationError as e:
+        raise ValueError(
+            [
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in e.errors()
+            ]
+        )
+
+
+def insert_colleges(db: Session, colleges: List[CollegeCreate]) -> List[int]:
+    """Insert a chunk with multi-row INSERTs and return the new ids in order."""
+    weighted_score = prior_mean(db)
+    rows = []
+    for college in colleges:
+        row = college.dict()
+        row.update(facet_columns(row["college_metadata"]))
+        row.update(
+            rating_sum=0.0,
+            rating_count=0,
+            average_rating=0.0,
+            total_reviews=0,
+            weighted_score=weighted_score,
+        )
+        rows.append(row)
+    college_ids = list(
+        db.scalars(insert(College).returning(College.id, sort_by_parameter_order=True), rows)
+    )
+    streams = [
+        {"college_id": college_id, "stream": stream}
+        for college_id, college in zip(college_ids, colleges)
+        for stream in sorted(derive_streams(college.college_metadata, college.programs))
+    ]
+    if streams:
+        db.execute(insert(CollegeStream), streams)
+    return college_ids
+
+
+class CollegeImport:
+    def __init__(self, db: Session):
+        self.db = db
+        self.result = CollegeImportResult(imported=0, failed=0, errors=[])
+        self._chunk: List[Tuple[int, CollegeCreate]] = []
+
+    def fail(self, row: int, errors: List[str]) -> None:
+        self.result.failed += 1
+        if len(self.result.errors) < IMPORT_MAX_ERRORS:
+            self.result.errors.append(CollegeImportError(row=row, errors=errors))
+
+    def add(self, row: int, record, format: str) -> bool:
+        """Validate a record; True when a full chunk is ready to write."""
+        try:
+            self._chunk.append((row, parse_record(record, format)))
+        except ValueError as e:
+            self.fail(row, e.args[0])
+        return len(self._chunk) >= IMPORT_CHUNK_ROWS
+
+    def write_chunk(self) -> None:
+        chunk, self._chunk = self._chunk, []
+        if not chunk:
+            return
+        try:
+            insert_colleges(self.db, [college for _, college in chunk])
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            message = f"database error: {e.__class__.__name__}"
+            for row, _ in chunk:
+                self.fail(row, [message])
+            return
+        self.result.imported += len(chunk)
+
+    async def run(self, body: AsyncIterator[bytes], format: str) -> CollegeImportResult:
+        lines = text_lines(body)
+        records = csv_records(lines) if format == "csv" else ndjson_records(lines)
+        row = 0
+        try:
+            async for record in records:
+                row += 1
+                if self.add(row, record, format):
+                    await run_in_threadpool(self.write_chunk)
+        except UnicodeDecodeError as e:
+            self.fail(row + 1, [f"body is not valid UTF-8 ({e.reason}); stopped reading here"])
+        await run_in_threadpool(self.write_chunk)
+        return self.result
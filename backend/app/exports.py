@@ -0,0 +1,122 @@
+"""
+Streaming review export.
+
+GET /reviews/export dumps every review matching the filters as NDJSON or CSV
+in a single ordered scan, instead of paging through /reviews with a count and
+an OFFSET per page. Rows come from a server-side cursor (yield_per, which
+enables stream_results on PostgreSQL) EXPORT_BATCH_ROWS at a time, and each
+batch is written out as one chunk, so memory stays flat whatever the table
+size.
+
+The export opens its own session: it outlives the request handler, and the
+rows are read while the response is being sent.
+"""
+
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+
+from models import College, Review, User
+
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", 1000))
+
+EXPORT_COLUMNS = [
+    "id",
+    "college_id",
+    "college_name",
+    "user_id",
+    "user_name",
+    "rating",
+    "title",
+    "content",
+    "program",
+    "graduation_year",
+    "images",
+    "is_verified",
+    "likes_count",
+    "created_at",
+    "updated_at",
+]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def review_export_statement(
+    college_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    verified: Optional[bool] = None,
+):
+    statement = (
+        select(
+            Review.id,
+            Review.college_id,
+            College.name.label("college_name"),
+            Review.user_id,
+            User.username.label("user_name"),
+            Review.rating,
+            Review.title,
+            Review.content,
+            Review.program,
+            Review.graduation_year,
+            Review.images,
+            Review.is_verified,
+            Review.likes_count,
+            Review.created_at,
+            Review.updated_at,
+        )
+        .join(College, Review.college_id == College.id)
+        .join(User, Review.user_id == User.id)
+        .order_by(Review.id)
+    )
+    if college_id is not None:
+        statement = statement.where(Review.college_id == college_id)
+    if created_from is not None:
+        statement = statement.where(Review.created_at >= created_from)
+    if created_to is not None:
+        statement = statement.where(Review.created_at < created_to)
+    if verified is not None:
+        statement = statement.where(Review.is_verified.is_(verified))
+    return statement
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _ndjson_batch(rows) -> str:
+    return "".join(json.dumps(row._asdict(), default=_json_value) + "\n" for row in rows)
+
+
+def _csv_batch(rows) -> str:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    for row in rows:
+        writer.writerow(
+            [
+                json.dumps(value) if column == "images" else _json_value(value)
+                for column, value in row._mapping.items()
+            ]
+        )
+    return out.getvalue()
+
+
+def export_reviews(session_factory, statement, format: str) -> Iterator[str]:
+    """Stream the rows of statement as format, one chunk per batch."""
+    db = session_factory()
+    try:
+        result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_ROWS))
+        if format == "csv":
+            out = io.StringIO()
+            csv.writer(out).writerow(EXPORT_COLUMNS)
+            yield out.getvalue()
+        encode = _csv_batch if format == "csv" else _ndjson_batch
+        for rows in result.partitions():
+            yield encode(rows)
+    finally:
+        db.close()
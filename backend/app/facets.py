@@ -0,0 +1,97 @@
+"""
+Typed filter facets for colleges.
+
+The listing filters (streams, fee range, scholarships) used to be evaluated in
+Python against the college_metadata JSON after pagination. The values are now
+copied into indexed columns and the college_streams table whenever a college
+is written, so the whole filter runs in SQL before count/offset/limit.
+"""
+
+from typing import Iterable, List, Optional, Set
+
+from sqlalchemy import or_, select
+
+from models import College, CollegeStream
+
+
+def _as_int(value) -> Optional[int]:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def derive_streams(metadata: Optional[dict], programs: Optional[Iterable[str]]) -> Set[str]:
+    meta = metadata or {}
+    streams = {s.strip().lower() for s in (meta.get("streams") or []) if s and s.strip()}
+
+    # fallback: infer from programs
+    if not streams:
+        prog = [p.lower() for p in (programs or []) if p]
+        if any("science" in p for p in prog):
+            streams.add("science")
+        if any("management" in p or "commerce" in p for p in prog):
+            streams.add("commerce")
+        if any("humanities" in p or "arts" in p for p in prog):
+            streams.add("humanities")
+    return streams
+
+
+def facet_columns(metadata: Optional[dict]) -> dict:
+    """The typed column values for a college_metadata dict."""
+    meta = metadata or {}
+    return {
+        "min_fee": _as_int(meta.get("min_fee")),
+        "max_fee": _as_int(meta.get("max_fee")),
+        "scholarships_available": bool(meta.get("scholarships_available")),
+    }
+
+
+def apply_college_facets(college: College) -> None:
+    """Copy the filterable college_metadata values onto their typed columns."""
+    for column, value in facet_columns(college.college_metadata).items():
+        setattr(college, column, value)
+
+    wanted = derive_streams(college.college_metadata, college.programs)
+    current = {facet.stream: facet for facet in college.stream_facets}
+    for stream, facet in current.items():
+        if stream not in wanted:
+            college.stream_facets.remove(facet)
+    for stream in sorted(wanted - set(current)):
+        college.stream_facets.append(CollegeStream(stream=stream))
+
+
+def parse_streams(streams: Optional[str]) -> List[str]:
+    if not streams:
+        return []
+    return sorted({s.strip().lower() for s in streams.split(",") if s.strip()})
+
+
+def filter_by_facets(
+    query,
+    streams: Optional[str] = None,
+    min_fee: Optional[int] = None,
+    max_fee: Optional[int] = None,
+    scholarships: Optional[bool] = None,
+):
+    """Apply the listing facet filters to a College query."""
+    wanted = parse_streams(streams)
+    if wanted:
+        query = query.filter(
+            College.id.in_(
+                select(CollegeStream.college_id).where(CollegeStream.stream.in_(wanted))
+            )
+        )
+
+    # Colleges without a complete fee range are never excluded by fee
+    no_fee_range = or_(College.min_fee.is_(None), College.max_fee.is_(None))
+    if max_fee is not None:
+        query = query.filter(or_(no_fee_range, College.min_fee <= max_fee))
+    if min_fee is not None:
+        query = query.filter(or_(no_fee_range, College.max_fee >= min_fee))
+
+    if scholarships is True:
+        query = query.filter(College.scholarships_available.is_(True))
+    return query
@@ -0,0 +1,60 @@
+"""
+ETags and conditional GETs for the college read endpoints.
+
+A handler computes a version for the resource from the row itself, from the
+cached page (college lists) or from a version counter that writes bump
+(review lists, versions.py), plus the viewer's own saved/liked state when
+the response carries per-viewer flags. The version hashes into a strong
+ETag. When If-None-Match matches, the handler returns 304 without
+serializing the body.
+
+Anonymous responses are public and cacheable for HTTP_CACHE_MAX_AGE
+seconds. Authenticated ones are private and revalidated on every use.
+"""
+
+import hashlib
+import os
+from typing import Optional
+
+from fastapi import Request, Response
+
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", 30))
+
+
+def make_etag(*parts) -> str:
+    return '"%s"' % hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison
+    candidates = (tag.strip() for tag in header.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def cache_headers(etag: str, anonymous: bool) -> dict:
+    return {
+        "ETag": etag,
+        "Cache-Control": (
+            f"public, max-age={HTTP_CACHE_MAX_AGE}" if anonymous else "private, no-cache"
+        ),
+        "Vary": "Authorization",
+    }
+
+
+def conditional_response(
+    request: Request, response: Response, etag: str, anonymous: bool
+) -> Optional[Response]:
+    """
+    Set the cache headers on response, and return a bare 304 when the client
+    already holds this version. None means build the body as usual.
+    """
+    headers = cache_headers(etag, anonymous)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
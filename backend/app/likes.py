@@ -0,0 +1,126 @@
+"""
+Review like counters.
+
+LIKE_COUNTER_MODE=direct (default) bumps reviews.likes_count with an atomic
+UPDATE in the like request itself.
+
+LIKE_COUNTER_MODE=buffered is for hot reviews: the ReviewLike row is still
+written immediately, but the likes_count deltas are folded in an in-process
+buffer and flushed every LIKE_FLUSH_SECONDS as one batched UPDATE, so likers
+don't queue on the review's row lock. The like endpoint returns the stored
+count plus whatever this worker still has buffered for the review.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Dict
+
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from database import SessionLocal
+from models import Review, ReviewLike
+from versions import bump_versions, college_reviews_version_key
+
+logger = logging.getLogger(__name__)
+
+LIKE_COUNTER_MODE = os.getenv("LIKE_COUNTER_MODE", "direct")
+LIKE_FLUSH_SECONDS = float(os.getenv("LIKE_FLUSH_SECONDS", 1.0))
+
+
+def increment_likes_count(db: Session, review_id: int, delta: int) -> int:
+    """Atomically shift a review's likes_count and return the new value."""
+    return db.execute(
+        update(Review)
+        .where(Review.id == review_id)
+        .values(likes_count=Review.likes_count + delta)
+        .returning(Review.likes_count)
+    ).scalar_one()
+
+
+def delete_review_likes(db: Session, review_id: int) -> None:
+    """
+    Call before deleting a review. PostgreSQL drops its likes itself (ON
+    DELETE CASCADE); SQLite doesn't enforce foreign keys, so there they go in
+    one bulk DELETE.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(delete(ReviewLike).where(ReviewLike.review_id == review_id))
+
+
+class LikeCounterBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._deltas: Dict[int, int] = {}
+        self._flushing: Dict[int, int] = {}
+
+    def add(self, review_id: int, delta: int) -> int:
+        """Buffer a delta and return everything not yet stored for the review."""
+        with self._lock:
+            self._deltas[review_id] = self._deltas.get(review_id, 0) + delta
+            return self._deltas[review_id] + self._flushing.get(review_id, 0)
+
+    def pending(self, review_id: int) -> int:
+        with self._lock:
+            return self._deltas.get(review_id, 0) + self._flushing.get(review_id, 0)
+
+    def flush(self, db: Session) -> int:
+        """Write the buffered deltas in one batched UPDATE. Returns rows touched."""
+        with self._flush_lock:
+            with self._lock:
+                deltas = {k: v for k, v in self._deltas.items() if v}
+                self._deltas = {}
+                self._flushing = deltas
+            if not deltas:
+                return 0
+
+            statement = (
+                Review.__table__.update()
+                .where(Review.__table__.c.id == bindparam("review_id"))
+                .values(likes_count=Review.__table__.c.likes_count + bindparam("delta"))
+            )
+            try:
+                # Sorted so concurrent flushers take row locks in the same order
+                db.connection().execute(
+                    statement,
+                    [{"review_id": k, "delta": deltas[k]} for k in sorted(deltas)],
+                )
+                college_ids = db.scalars(
+                    select(Review.college_id).where(Review.id.in_(deltas)).distinct()
+                )
+                bump_versions(db, *map(college_reviews_version_key, college_ids))
+                db.commit()
+            except Exception:
+                db.rollback()
+                with self._lock:
+                    for review_id, delta in deltas.items():
+                        self._deltas[review_id] = self._deltas.get(review_id, 0) + delta
+                    self._flushing = {}
+                raise
+            with self._lock:
+                self._flushing = {}
+            return len(deltas)
+
+
+like_buffer = LikeCounterBuffer()
+
+
+def flush_like_buffer() -> int:
+    db = SessionLocal()
+    try:
+        return like_buffer.flush(db)
+    finally:
+        db.close()
+
+
+async def keep_like_buffer_flushed():
+    while True:
+        await asyncio.sleep(LIKE_FLUSH_SECONDS)
+        try:
+            await run_in_threadpool(flush_like_buffer)
+        except Exception:
+            logger.exception("Failed to flush buffered review like counts")
@@ -0,0 +1,166 @@
+"""
+Result cache for GET /colleges.
+
+The same few listings (first page, default sort, common cities) are asked for
+over and over. Each cached entry holds one page already serialized to JSON,
+and a digest of it that the page's ETag is built from, keyed on the
+filter/sort/page parameters. Handlers normalize the filters with
+listing_filters() and hand the same values to the query and the key, so
+equivalent requests share an entry and get the same rows whether or not it
+is cached. A hit skips the count, the page query and serialization.
+
+Writes drop exactly the entries they make stale: a review write on a college
+drops the pages that show it and every page in a rating-based sort order,
+rescoring drops the weighted pages, and college CRUD clears everything. The
+cache is per process, so another worker's writes show up here once the
+entries they affect expire. It is bounded by LISTING_CACHE_SIZE entries and
+LISTING_CACHE_TTL_SECONDS (0 disables it).
+"""
+
+import hashlib
+import os
+from typing import FrozenSet, Iterable, NamedTuple, Optional, Set
+
+from fastapi import Response
+
+from lru import TTLCache
+from schemas import CollegeListResponse
+
+LISTING_CACHE_SIZE = int(os.getenv("LISTING_CACHE_SIZE", 1000))
+LISTING_CACHE_TTL_SECONDS = float(os.getenv("LISTING_CACHE_TTL_SECONDS", 60))
+
+# Orders a rating change on any college can reshuffle
+RATING_SORTS = {"highest", "most", "weighted"}
+
+
+class ListingKey(NamedTuple):
+    search: Optional[str]
+    city: Optional[str]
+    state: Optional[str]
+    streams: Optional[str]
+    min_fee: Optional[int]
+    max_fee: Optional[int]
+    scholarships: Optional[bool]
+    sort: Optional[str]
+    page: int
+    limit: int
+
+
+class CachedListing(NamedTuple):
+    body: bytes
+    digest: str
+    college_ids: FrozenSet[int]
+    response: CollegeListResponse
+
+
+def _normalize(value: Optional[str]) -> Optional[str]:
+    # Every text filter matches case-insensitively
+    value = (value or "").strip().lower()
+    return value or None
+
+
+def listing_filters(
+    search: Optional[str] = None,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    streams: Optional[str] = None,
+    min_fee: Optional[int] = None,
+    max_fee: Optional[int] = None,
+    scholarships: Optional[bool] = None,
+    sort: Optional[str] = None,
+) -> dict:
+    """The GET /colleges filters as both the query and the cache key take them."""
+    if streams:
+        streams = ",".join(sorted({s.strip().lower() for s in streams.split(",") if s.strip()}))
+    return dict(
+        search=_normalize(search),
+        city=_normalize(city),
+        state=_normalize(state),
+        streams=streams or None,
+        min_fee=min_fee,
+        max_fee=max_fee,
+        scholarships=scholarships,
+        sort=sort,
+    )
+
+
+def listing_key(
+    search: Optional[str] = None,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    streams: Optional[str] = None,
+    min_fee: Optional[int] = None,
+    max_fee: Optional[int] = None,
+    scholarships: Optional[bool] = None,
+    sort: Optional[str] = None,
+    page: int = 1,
+    limit: int = 10,
+) -> ListingKey:
+    """Key for filters already passed through listing_filters()."""
+    return ListingKey(
+        search=search,
+        city=city,
+        state=state,
+        streams=streams,
+        min_fee=min_fee,
+        max_fee=max_fee,
+        scholarships=scholarships,
+        sort=sort if sort in RATING_SORTS else None,
+        page=page,
+        limit=limit,
+    )
+
+
+class CollegeListingCache(TTLCache):
+    def __init__(
+        self, max_size: int = LISTING_CACHE_SIZE, ttl: float = LISTING_CACHE_TTL_SECONDS
+    ):
+        super().__init__(max_size, ttl)
+
+    def store(self, key: ListingKey, response: CollegeListResponse) -> CachedListing:
+        """Serialize a viewer-neutral page (no saved flags) and cache it."""
+        body = response.model_dump_json().encode()
+        cached = CachedListing(
+            body=body,
+            digest=hashlib.sha1(body).hexdigest(),
+            college_ids=frozenset(college.id for college in response.colleges),
+            response=response,
+        )
+        self.put(key, cached)
+        return cached
+
+    def colleges_rated(self, college_ids: Iterable[int]) -> None:
+        """Reviews of these colleges were written, edited or deleted."""
+        college_ids = set(college_ids)
+        self.discard_where(
+            lambda key, cached: key.sort in RATING_SORTS
+            or not college_ids.isdisjoint(cached.college_ids)
+        )
+
+    def catalog_rescored(self) -> None:
+        self.discard_where(lambda key, cached: key.sort == "weighted")
+
+    def catalog_changed(self) -> None:
+        """A college was created, updated or deleted."""
+        self.clear()
+
+
+listing_cache = CollegeListingCache()
+
+
+def listing_response(cached: CachedListing, saved_ids: Set[int], headers: dict) -> Response:
+    """The cached page as a response, with the viewer's saved flags applied."""
+    body = cached.body
+    if saved_ids:
+        response = cached.response.model_copy(
+            update={
+                "colleges": [
+                    college.model_copy(update={"is_saved_by_current_user": True})
+                    if college.id in saved_ids
+                    else college
+                    for college in cached.response.colleges
+                ]
+            }
+        )
+        body = response.model_dump_json().encode()
+    return Response(content=body, media_type="application/json", headers=headers)
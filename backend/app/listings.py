@@ -0,0 +1,152 @@
+"""
+Statements and response assembly for the hot read endpoints.
+
+The college list and college reviews endpoints exist twice: as sync handlers
+in main.py and as async handlers in async_api.py (DATABASE_ASYNC). Both build
+their SELECTs and responses here so the two paths can't drift apart.
+"""
+
+import math
+from typing import Iterable, List, Optional, Set
+
+from sqlalchemy import desc, func, select
+from sqlalchemy.orm import contains_eager
+
+from facets import filter_by_facets
+from models import College, Review
+from principals import Principal
+from schemas import CollegeListResponse, CollegeResponse, ReviewListResponse, ReviewResponse
+from search import apply_search
+from versions import college_reviews_version_key, version_statement
+
+COLLEGE_REVIEW_ORDER = (Review.created_at, Review.id)
+
+
+def college_review_key(review: Review):
+    return (review.created_at, review.id)
+
+
+def count_statement(statement):
+    return select(func.count()).select_from(statement.order_by(None).subquery())
+
+
+def college_list_statement(
+    dialect_name: str,
+    search: Optional[str] = None,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    streams: Optional[str] = None,
+    min_fee: Optional[int] = None,
+    max_fee: Optional[int] = None,
+    scholarships: Optional[bool] = None,
+    sort: Optional[str] = None,
+):
+    statement = select(College)
+
+    # Apply filters
+    relevance = None
+    if search:
+        statement, relevance = apply_search(statement, search, dialect_name)
+    if city:
+        statement = statement.filter(College.city.ilike(f"%{city}%"))
+    if state:
+        statement = statement.filter(College.state.ilike(f"%{state}%"))
+    statement = filter_by_facets(
+        statement,
+        streams=streams,
+        min_fee=min_fee,
+        max_fee=max_fee,
+        scholarships=scholarships,
+    )
+
+    # Sorting
+    if sort == "highest":
+        return statement.order_by(
+            desc(College.average_rating), desc(College.total_reviews), desc(College.id)
+        )
+    if sort == "most":
+        return statement.order_by(
+            desc(College.total_reviews), desc(College.average_rating), desc(College.id)
+        )
+    if sort == "weighted":
+        return statement.order_by(
+            desc(College.weighted_score), desc(College.total_reviews), desc(College.id)
+        )
+    if relevance is not None:
+        return statement.order_by(desc(relevance), College.id)
+    return statement.order_by(College.id)
+
+
+def college_version(college: College) -> tuple:
+    return (
+        college.id,
+        college.updated_at,
+        college.created_at,
+        college.rating_count,
+        college.rating_sum,
+        college.weighted_score,
+    )
+
+
+def college_reviews_version_statement(college_id: int):
+    return version_statement(college_reviews_version_key(college_id))
+
+
+def viewer_key(current_user: Optional[Principal]):
+    return current_user.id if current_user is not None else None
+
+
+def college_response(college: College, saved_ids: Set[int]) -> CollegeResponse:
+    response = CollegeResponse.from_orm(college)
+    response.is_saved_by_current_user = college.id in saved_ids
+    return response
+
+
+def college_list_response(
+    colleges: Iterable[College], saved_ids: Set[int], total: int, page: int, limit: int
+) -> CollegeListResponse:
+    return CollegeListResponse(
+        colleges=[college_response(college, saved_ids) for college in colleges],
+        total=total,
+        page=page,
+        pages=math.ceil(total / limit),
+    )
+
+
+def college_reviews_statement(college_id: int):
+    return (
+        select(Review)
+        .join(Review.user)
+        .options(contains_eager(Review.user))
+        .where(Review.college_id == college_id)
+    )
+
+
+def college_reviews_response(
+    college: College,
+    reviews: List[Review],
+    liked_ids: Set[int],
+    current_user: Optional[Principal],
+    total: int,
+    page: int,
+    limit: int,
+    next_cursor: Optional[str],
+) -> ReviewListResponse:
+    review_responses = []
+    for review in reviews:
+        review_response = ReviewResponse.from_orm(review)
+        review_response.user_name = review.user.username
+        review_response.college_name = college.name
+        review_response.is_liked_by_current_user = review.id in liked_ids
+        review_response.is_owned_by_current_user = (
+            current_user is not None and review.user_id == current_user.id
+        )
+        review_responses.append(review_response)
+
+    return ReviewListResponse(
+        reviews=review_responses,
+        total=total,
+        page=page,
+        pages=math.ceil(total / limit),
+        next_cursor=next_cursor,
+    )
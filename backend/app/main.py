@@ -1,14 +1,72 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Query
+from fastapi import FastAPI, Depends, HTTPException, status, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, contains_eager
 from sqlalchemy.sql import func
-from sqlalchemy import and_, or_, desc
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 from datetime import timedelta, datetime
 import math
-
-from database import get_db, engine
+import asyncio
+
+from database import (
+    DATABASE_ASYNC,
+    READ_DATABASE_URL,
+    async_engine,
+    async_read_engine,
+    engine,
+    get_db,
+    read_engine,
+)
 from models import Base, User, College, Review, ReviewLike, SavedCollege
+from facets import apply_college_facets
+from ratings import (
+    apply_rating_delta,
+    init_college_rating,
+    keep_catalog_scores_fresh,
+    refresh_catalog_scores,
+)
+from viewer import (
+    liked_review_ids,
+    liked_reviews_version_statement,
+    saved_college_ids,
+)
+from httpcache import cache_headers, conditional_response, make_etag
+from listing_cache import listing_cache, listing_filters, listing_key, listing_response
+from pagination import keyset_page, keyset_window, split_page
+from listings import (
+    COLLEGE_REVIEW_ORDER,
+    college_list_response,
+    college_list_statement,
+    college_response,
+    college_review_key,
+    college_reviews_response,
+    college_reviews_statement,
+    college_reviews_version_statement,
+    college_version,
+    count_statement,
+    viewer_key,
+)
+from versions import bump_versions, college_reviews_version_key
+from suggest import college_index, keep_college_index_fresh, refresh_college_index
+from admin_stats import admin_stats, keep_admin_stats_fresh
+from college_import import CollegeImport, import_format
+import likes
+from pooling import pool_stats
+from querystats import QueryStatsMiddleware
+import metrics
+import profiling
+from memory_diagnostics import (
+    MEMORY_TRACE_FRAMES,
+    MemoryMiddleware,
+    NotTracing,
+    memory_diagnostics,
+)
+from replicas import ReadYourWritesMiddleware, get_read_db, read_session_factory
+from exports import MEDIA_TYPES, export_reviews, review_export_statement
+from passwords import hash_password, password_hasher
+import async_api
 from schemas import *
 from auth import *
 
@@ -20,6 +78,8 @@ app = FastAPI(
     description="API for college reviews and user management",
     version="1.0.0",
 )
+# Lets ProfilingMiddleware profile a request's handler; see profiling.py
+app.router.route_class = profiling.ProfilingRoute
 
 # CORS middleware
 app.add_middleware(
@@ -30,32 +90,104 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if READ_DATABASE_URL:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+app.add_middleware(MemoryMiddleware)
+app.add_middleware(profiling.ProfilingMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+# Outermost, so the slow-request log times the whole request
+app.add_middleware(QueryStatsMiddleware)
+
+# Registered first so the async read handlers take precedence over main.py's
+if DATABASE_ASYNC:
+    app.include_router(async_api.router)
+
+
+@app.on_event("startup")
+async def load_college_suggest_index():
+    await run_in_threadpool(refresh_college_index)
+    app.state.college_index_refresher = asyncio.create_task(keep_college_index_fresh())
+
+
+@app.on_event("startup")
+async def load_weighted_score_prior():
+    await run_in_threadpool(refresh_catalog_scores)
+    app.state.catalog_scores_refresher = asyncio.create_task(keep_catalog_scores_fresh())
+
+
+@app.on_event("startup")
+async def start_like_buffer_flusher():
+    if likes.LIKE_COUNTER_MODE == "buffered":
+        app.state.like_buffer_flusher = asyncio.create_task(
+            likes.keep_like_buffer_flushed()
+        )
+
+
+@app.on_event("startup")
+async def start_admin_stats_refresher():
+    app.state.admin_stats_refresher = asyncio.create_task(keep_admin_stats_fresh())
+
+
+@app.on_event("startup")
+async def start_password_hasher():
+    password_hasher.start()
+
+
+@app.on_event("shutdown")
+async def stop_password_hasher():
+    password_hasher.shutdown()
+
+
+@app.on_event("shutdown")
+async def flush_like_buffer_on_shutdown():
+    if likes.LIKE_COUNTER_MODE == "buffered":
+        await run_in_threadpool(likes.flush_like_buffer)
+
+
+def flush_unique(db: Session, detail: str):
+    """Flush a pending insert; a concurrent duplicate request gets a 409."""
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=detail)
+
 
 # Auth endpoints
 @app.post("/auth/register", response_model=AuthResponse)
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+    # Async so the bcrypt hash waits on the password process pool rather than
+    # a threadpool worker; the DB work still runs in the threadpool
+    def find_existing_user():
+        return (
+            db.query(User)
+            .filter((User.email == user.email) | (User.username == user.username))
+            .first()
+        )
+
     # Check if user exists
-    db_user = (
-        db.query(User)
-        .filter((User.email == user.email) | (User.username == user.username))
-        .first()
-    )
+    db_user = await run_in_threadpool(find_existing_user)
     if db_user:
         raise HTTPException(
             status_code=400, detail="User with this email or username already exists"
         )
 
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await hash_password(user.password)
     db_user = User(
         email=user.email,
         username=user.username,
         full_name=user.full_name,
         hashed_password=hashed_password,
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+
+    def save_user():
+        db.add(db_user)
+        db.commit()
+        db.refresh(db_user)
+
+    await run_in_threadpool(save_user)
 
     # Create access token for the newly registered user
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -67,8 +199,8 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
 
 
 @app.post("/auth/login", response_model=Token)
-def login_user(login_data: LoginRequest, db: Session = Depends(get_db)):
-    user = authenticate_user(db, login_data.username, login_data.password)
+async def login_user(login_data: LoginRequest, db: Session = Depends(get_db)):
+    user = await authenticate_user(db, login_data.username, login_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -140,19 +272,26 @@ def update_profile(
 def get_user_reviews(
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_active_principal),
+    db: Session = Depends(get_read_db)
 ):
     query = (
         db.query(Review)
         .filter(Review.user_id == current_user.id)
         .join(College)
-        .order_by(desc(Review.created_at))
+        .options(contains_eager(Review.college))
     )
     
     total = query.count()
-    offset = (page - 1) * limit
-    reviews = query.offset(offset).limit(limit).all()
+    reviews, next_cursor = keyset_page(
+        query,
+        [Review.created_at, Review.id],
+        key=lambda r: (r.created_at, r.id),
+        limit=limit,
+        page=page,
+        cursor=cursor,
+    )
     
     # Convert to response format
     review_responses = []
@@ -166,7 +305,11 @@ def get_user_reviews(
     
     pages = math.ceil(total / limit)
     return ReviewListResponse(
-        reviews=review_responses, total=total, page=page, pages=pages
+        reviews=review_responses,
+        total=total,
+        page=page,
+        pages=pages,
+        next_cursor=next_cursor,
     )
 
 
@@ -174,26 +317,33 @@ def get_user_reviews(
 def get_liked_reviews(
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_active_principal),
+    db: Session = Depends(get_read_db)
 ):
     # Get reviews that the current user has liked
     query = (
-        db.query(Review)
+        db.query(Review, ReviewLike.created_at, ReviewLike.id)
         .join(ReviewLike, Review.id == ReviewLike.review_id)
         .join(User, Review.user_id == User.id)
         .join(College, Review.college_id == College.id)
+        .options(contains_eager(Review.user), contains_eager(Review.college))
         .filter(ReviewLike.user_id == current_user.id)
-        .order_by(desc(ReviewLike.created_at))
     )
     
     total = query.count()
-    offset = (page - 1) * limit
-    reviews = query.offset(offset).limit(limit).all()
+    rows, next_cursor = keyset_page(
+        query,
+        [ReviewLike.created_at, ReviewLike.id],
+        key=lambda row: (row[1], row[2]),
+        limit=limit,
+        page=page,
+        cursor=cursor,
+    )
     
     # Convert to response format
     review_responses = []
-    for review in reviews:
+    for review, _liked_at, _like_id in rows:
         review_response = ReviewResponse.from_orm(review)
         review_response.user_name = review.user.username
         review_response.college_name = review.college.name
@@ -203,7 +353,11 @@ def get_liked_reviews(
     
     pages = math.ceil(total / limit)
     return ReviewListResponse(
-        reviews=review_responses, total=total, page=page, pages=pages
+        reviews=review_responses,
+        total=total,
+        page=page,
+        pages=pages,
+        next_cursor=next_cursor,
     )
 
 
@@ -211,19 +365,26 @@ def get_liked_reviews(
 def get_saved_colleges(
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_active_principal),
+    db: Session = Depends(get_read_db)
 ):
     query = (
         db.query(SavedCollege)
         .join(College)
+        .options(contains_eager(SavedCollege.college))
         .filter(SavedCollege.user_id == current_user.id)
-        .order_by(desc(SavedCollege.created_at))
     )
     
     total = query.count()
-    offset = (page - 1) * limit
-    saved_colleges = query.offset(offset).limit(limit).all()
+    saved_colleges, next_cursor = keyset_page(
+        query,
+        [SavedCollege.created_at, SavedCollege.id],
+        key=lambda sc: (sc.created_at, sc.id),
+        limit=limit,
+        page=page,
+        cursor=cursor,
+    )
     
     # Convert to response format
     saved_college_responses = []
@@ -243,7 +404,11 @@ def get_saved_colleges(
     
     pages = math.ceil(total / limit)
     return SavedCollegeListResponse(
-        saved_colleges=saved_college_responses, total=total, page=page, pages=pages
+        saved_colleges=saved_college_responses,
+        total=total,
+        page=page,
+        pages=pages,
+        next_cursor=next_cursor,
     )
 
 
@@ -251,7 +416,7 @@ def get_saved_colleges(
 @app.post("/colleges/{college_id}/bookmark")
 def toggle_college_bookmark(
     college_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
     db: Session = Depends(get_db)
 ):
     # Check if college exists
@@ -277,6 +442,7 @@ def toggle_college_bookmark(
         # Add bookmark
         new_save = SavedCollege(college_id=college_id, user_id=current_user.id)
         db.add(new_save)
+        flush_unique(db, "College already saved")
         saved = True
     
     db.commit()
@@ -288,17 +454,44 @@ def toggle_college_bookmark(
 def create_college(
     college: CollegeCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     db_college = College(**college.dict())
+    apply_college_facets(db_college)
+    init_college_rating(db, db_college)
     db.add(db_college)
     db.commit()
     db.refresh(db_college)
+    college_index.upsert(db_college)
+    listing_cache.catalog_changed()
     return db_college
 
 
+@app.post("/colleges/import", response_model=CollegeImportResult)
+async def import_colleges(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db),
+    admin: Principal = Depends(get_current_admin_principal),
+):
+    """Bulk create colleges from a streamed CSV or NDJSON body (admin)"""
+    format = import_format(request.headers.get("content-type"), format)
+    if format is None:
+        raise HTTPException(
+            status_code=415,
+            detail="Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson",
+        )
+    result = await CollegeImport(db).run(request.stream(), format)
+    if result.imported:
+        await run_in_threadpool(refresh_college_index)
+        listing_cache.catalog_changed()
+    return result
+
+
 @app.get("/colleges", response_model=CollegeListResponse)
 def get_colleges(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
     search: Optional[str] = None,
@@ -309,143 +502,76 @@ def get_colleges(
     max_fee: Optional[int] = None,
     scholarships: Optional[bool] = None,
     sort: Optional[str] = None,  # 'highest' | 'most' | 'weighted'
-    db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: Optional[Principal] = Depends(get_current_principal_optional),
 ):
-    query = db.query(College)
-
-    # Apply filters
-    if search:
-        query = query.filter(College.name.ilike(f"%{search}%"))
-    if city:
-        query = query.filter(College.city.ilike(f"%{city}%"))
-    if state:
-        query = query.filter(College.state.ilike(f"%{state}%"))
+    filters = listing_filters(
+        search=search,
+        city=city,
+        state=state,
+        streams=streams,
+        min_fee=min_fee,
+        max_fee=max_fee,
+        scholarships=scholarships,
+        sort=sort,
+    )
+    key = listing_key(page=page, limit=limit, **filters)
+    cached = listing_cache.get(key)
+    if cached is None:
+        statement = college_list_statement(db.get_bind().dialect.name, **filters)
+
+        # Get total count
+        total = db.execute(count_statement(statement)).scalar_one()
+
+        # Apply pagination
+        offset = (page - 1) * limit
+        colleges = db.execute(statement.offset(offset).limit(limit)).scalars().all()
+        cached = listing_cache.store(
+            key, college_list_response(colleges, set(), total, page, limit)
+        )
 
-    # Get total count
-    total = query.count()
+    # Apply the viewer's bookmark status
+    saved_ids = saved_college_ids(db, current_user, cached.college_ids)
+    etag = make_etag("colleges", cached.digest, viewer_key(current_user), sorted(saved_ids))
+    not_modified = conditional_response(request, response, etag, current_user is None)
+    if not_modified:
+        return not_modified
+    return listing_response(cached, saved_ids, cache_headers(etag, current_user is None))
 
-    # Apply pagination
-    offset = (page - 1) * limit
-    colleges = query.offset(offset).limit(limit).all()
-
-    # Post-filter based on college_metadata
-    def matches_metadata_filters(c: College) -> bool:
-        meta = c.college_metadata or {}
-        # Streams
-        if streams:
-            wanted = {s.strip().lower() for s in streams.split(',') if s.strip()}
-            c_streams = set(
-                s.lower() for s in (meta.get("streams") or [])
-            )
-            # fallback: infer from programs
-            if not c_streams:
-                prog = [p.lower() for p in (c.programs or [])]
-                if any("science" in p for p in prog):
-                    c_streams.add("science")
-                if any("management" in p or "commerce" in p for p in prog):
-                    c_streams.add("commerce")
-                if any("humanities" in p or "arts" in p for p in prog):
-                    c_streams.add("humanities")
-            if wanted and not (wanted & c_streams):
-                return False
-        # Fee
-        c_min = meta.get("min_fee")
-        c_max = meta.get("max_fee")
-        if (min_fee is not None or max_fee is not None) and c_min is not None and c_max is not None:
-            if max_fee is not None and c_min > max_fee:
-                return False
-            if min_fee is not None and c_max < min_fee:
-                return False
-        # Scholarships
-        if scholarships is True and not bool(meta.get("scholarships_available")):
-            return False
-        return True
-
-    colleges = [c for c in colleges if matches_metadata_filters(c)]
-
-    # Sorting
-    def weighted_score(c: College, c_mean: float, m: int) -> float:
-        v = c.total_reviews or 0
-        R = c.average_rating or 0.0
-        return (v / (v + m)) * R + (m / (v + m)) * c_mean if (v + m) > 0 else R
-
-    if sort in {"highest", "most", "weighted"}:
-        if sort == "highest":
-            reviewed = [c for c in colleges if (c.total_reviews or 0) > 0]
-            no_reviews = [c for c in colleges if (c.total_reviews or 0) == 0]
-            reviewed.sort(key=lambda c: (c.average_rating or 0.0, c.total_reviews or 0), reverse=True)
-            colleges = reviewed + no_reviews
-        elif sort == "most":
-            reviewed = [c for c in colleges if (c.total_reviews or 0) > 0]
-            no_reviews = [c for c in colleges if (c.total_reviews or 0) == 0]
-            reviewed.sort(key=lambda c: (c.total_reviews or 0, c.average_rating or 0.0), reverse=True)
-            colleges = reviewed + no_reviews
-        else:
-            reviewed = [c for c in colleges if (c.total_reviews or 0) > 0]
-            if reviewed:
-                c_mean = sum((c.average_rating or 0.0) for c in reviewed) / len(reviewed)
-                m = 5
-                colleges.sort(
-                    key=lambda c: (
-                        weighted_score(c, c_mean, m),
-                        c.total_reviews or 0,
-                    ),
-                    reverse=True,
-                )
-
-    # Convert to response format with bookmark status
-    college_responses = []
-    for college in colleges:
-        college_response = CollegeResponse.from_orm(college)
-        
-        # Check if saved by current user
-        if current_user:
-            is_saved = (
-                db.query(SavedCollege)
-                .filter(
-                    SavedCollege.college_id == college.id,
-                    SavedCollege.user_id == current_user.id
-                )
-                .first() is not None
-            )
-            college_response.is_saved_by_current_user = is_saved
-        else:
-            college_response.is_saved_by_current_user = False
-        
-        college_responses.append(college_response)
 
-    pages = math.ceil(total / limit)
-    return CollegeListResponse(colleges=college_responses, total=total, page=page, pages=pages)
+@app.get("/colleges/suggest", response_model=List[CollegeSuggestion])
+async def suggest_colleges(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=20),
+):
+    """Autocomplete from the in-memory college index, without a DB round trip"""
+    return [
+        CollegeSuggestion(id=college_id, name=name)
+        for college_id, name in college_index.suggest(q, limit)
+    ]
 
 
 @app.get("/colleges/{college_id}", response_model=CollegeResponse)
 def get_college(
-    college_id: int, 
-    db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_current_user)
+    college_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: Optional[Principal] = Depends(get_current_principal_optional),
 ):
     college = db.query(College).filter(College.id == college_id).first()
     if not college:
         raise HTTPException(status_code=404, detail="College not found")
-    
-    college_response = CollegeResponse.from_orm(college)
-    
-    # Check if saved by current user
-    if current_user:
-        is_saved = (
-            db.query(SavedCollege)
-            .filter(
-                SavedCollege.college_id == college.id,
-                SavedCollege.user_id == current_user.id
-            )
-            .first() is not None
-        )
-        college_response.is_saved_by_current_user = is_saved
-    else:
-        college_response.is_saved_by_current_user = False
-    
-    return college_response
+
+    saved_ids = saved_college_ids(db, current_user, [college.id])
+    etag = make_etag(
+        "college", college_version(college), viewer_key(current_user), college.id in saved_ids
+    )
+    not_modified = conditional_response(request, response, etag, current_user is None)
+    if not_modified:
+        return not_modified
+
+    return college_response(college, saved_ids)
 
 
 # Review endpoints
@@ -453,7 +579,7 @@ def get_college(
 def create_review(
     review: ReviewCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     # Check if college exists
     college = db.query(College).filter(College.id == review.college_id).first()
@@ -479,16 +605,8 @@ def create_review(
     db.flush()  # Ensure the review is visible to subsequent queries
 
     # Update college ratings
-    college.total_reviews += 1
-    avg_rating = (
-        db.query(func.avg(Review.rating))
-        .filter(Review.college_id == review.college_id)
-        .scalar()
-    )
-    if avg_rating is None:
-        college.average_rating = round(review.rating, 1)
-    else:
-        college.average_rating = round(avg_rating, 1)
+    apply_rating_delta(db, college.id, db_review.rating, 1)
+    bump_versions(db, college_reviews_version_key(college.id))
 
     db.commit()
     db.refresh(db_review)
@@ -508,7 +626,7 @@ def update_review(
     review_id: int,
     review_update: ReviewUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     # Get the review
     review = db.query(Review).filter(Review.id == review_id).first()
@@ -519,19 +637,16 @@ def update_review(
     if review.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to edit this review")
     
+    old_rating = review.rating
+    
     # Update review fields
     for field, value in review_update.dict(exclude_unset=True).items():
         setattr(review, field, value)
     
     # Update college average rating if rating changed
-    if review_update.rating is not None:
-        college = db.query(College).filter(College.id == review.college_id).first()
-        avg_rating = (
-            db.query(func.avg(Review.rating))
-            .filter(Review.college_id == review.college_id)
-            .scalar()
-        )
-        college.average_rating = round(avg_rating, 1)
+    if review_update.rating is not None and review_update.rating != old_rating:
+        apply_rating_delta(db, review.college_id, review_update.rating - old_rating, 0)
+    bump_versions(db, college_reviews_version_key(review.college_id))
     
     db.commit()
     db.refresh(review)
@@ -543,15 +658,9 @@ def update_review(
     response.is_owned_by_current_user = True
     
     # Check if current user liked this review
-    liked = (
-        db.query(ReviewLike)
-        .filter(
-            ReviewLike.review_id == review.id,
-            ReviewLike.user_id == current_user.id,
-        )
-        .first()
+    response.is_liked_by_current_user = review.id in liked_review_ids(
+        db, current_user, [review.id]
     )
-    response.is_liked_by_current_user = liked is not None
     
     return response
 
@@ -560,7 +669,7 @@ def update_review(
 def delete_review(
     review_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     # Get the review
     review = db.query(Review).filter(Review.id == review_id).first()
@@ -571,24 +680,13 @@ def delete_review(
     if review.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this review")
     
-    college_id = review.college_id
-    
-    # Delete the review (cascade will handle review likes)
+    # Delete the review and its likes
+    likes.delete_review_likes(db, review_id)
     db.delete(review)
     
     # Update college ratings
-    college = db.query(College).filter(College.id == college_id).first()
-    college.total_reviews -= 1
-    
-    if college.total_reviews > 0:
-        avg_rating = (
-            db.query(func.avg(Review.rating))
-            .filter(Review.college_id == college_id)
-            .scalar()
-        )
-        college.average_rating = round(avg_rating, 1)
-    else:
-        college.average_rating = 0.0
+    apply_rating_delta(db, review.college_id, -review.rating, -1)
+    bump_versions(db, college_reviews_version_key(review.college_id))
     
     db.commit()
     
@@ -598,52 +696,57 @@ def delete_review(
 @app.get("/colleges/{college_id}/reviews", response_model=ReviewListResponse)
 def get_college_reviews(
     college_id: int,
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_current_user_optional),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: Optional[Principal] = Depends(get_current_principal_optional),
 ):
     # Check if college exists
     college = db.query(College).filter(College.id == college_id).first()
     if not college:
         raise HTTPException(status_code=404, detail="College not found")
 
+    # Answer If-None-Match before loading the page
+    version = db.execute(college_reviews_version_statement(college_id)).scalar() or 0
+    viewer_version = None
+    if current_user is not None:
+        viewer_version = tuple(
+            db.execute(liked_reviews_version_statement(current_user.id)).one()
+        )
+    etag = make_etag(
+        "college_reviews",
+        college_version(college),
+        version,
+        viewer_key(current_user),
+        viewer_version,
+    )
+    not_modified = conditional_response(request, response, etag, current_user is None)
+    if not_modified:
+        return not_modified
+
     # Get reviews with user information
-    query = db.query(Review).filter(Review.college_id == college_id).join(User)
-    total = query.count()
+    statement = college_reviews_statement(college_id)
+    total = db.execute(count_statement(statement)).scalar_one()
 
-    offset = (page - 1) * limit
-    reviews = query.offset(offset).limit(limit).all()
+    window = keyset_window(
+        statement,
+        COLLEGE_REVIEW_ORDER,
+        limit=limit,
+        page=page,
+        cursor=cursor,
+        dialect_name=db.get_bind().dialect.name,
+    )
+    reviews, next_cursor = split_page(
+        db.execute(window).scalars().all(), college_review_key, limit
+    )
 
     # Convert to response format
-    review_responses = []
-    for review in reviews:
-        review_response = ReviewResponse.from_orm(review)
-        review_response.user_name = review.user.username
-        review_response.college_name = college.name
-
-        # Check if current user liked this review
-        if current_user:
-            liked = (
-                db.query(ReviewLike)
-                .filter(
-                    ReviewLike.review_id == review.id,
-                    ReviewLike.user_id == current_user.id,
-                )
-                .first()
-            )
-            review_response.is_liked_by_current_user = liked is not None
-            review_response.is_owned_by_current_user = review.user_id == current_user.id
-        else:
-            review_response.is_liked_by_current_user = False
-            review_response.is_owned_by_current_user = False
-
-        review_responses.append(review_response)
-
-    pages = math.ceil(total / limit)
-
-    return ReviewListResponse(
-        reviews=review_responses, total=total, page=page, pages=pages
+    liked_ids = liked_review_ids(db, current_user, (r.id for r in reviews))
+    return college_reviews_response(
+        college, reviews, liked_ids, current_user, total, page, limit, next_cursor
     )
 
 
@@ -651,7 +754,7 @@ def get_college_reviews(
 def toggle_review_like(
     review_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ):
     # Check if review exists
     review = db.query(Review).filter(Review.id == review_id).first()
@@ -670,18 +773,27 @@ def toggle_review_like(
     if existing_like:
         # Unlike
         db.delete(existing_like)
-        review.likes_count -= 1
+        delta = -1
         liked = False
     else:
         # Like
         new_like = ReviewLike(review_id=review_id, user_id=current_user.id)
         db.add(new_like)
-        review.likes_count += 1
+        flush_unique(db, "Review already liked")
+        delta = 1
         liked = True
 
-    db.commit()
+    if likes.LIKE_COUNTER_MODE == "buffered":
+        # Record the like now, fold the counter into the next batched flush
+        stored_count = review.likes_count
+        db.commit()
+        likes_count = stored_count + likes.like_buffer.add(review_id, delta)
+    else:
+        likes_count = likes.increment_likes_count(db, review_id, delta)
+        bump_versions(db, college_reviews_version_key(review.college_id))
+        db.commit()
 
-    return {"liked": liked, "likes_count": review.likes_count}
+    return {"liked": liked, "likes_count": likes_count}
 
 
 # Health check
@@ -691,28 +803,101 @@ def root():
 
 
 # Admin endpoints
+@app.get("/admin/stats", response_model=AdminStats)
+def get_admin_stats(
+    db: Session = Depends(get_read_db),
+    admin: Principal = Depends(get_current_admin_principal),
+):
+    """Dashboard totals, daily rollups and recent activity (admin)"""
+    return admin_stats.get(db)
+
+
+@app.get("/admin/profiles", response_model=List[str])
+def list_request_profiles(admin: Principal = Depends(get_current_admin_principal)):
+    """Saved request profiles, newest first"""
+    return profiling.list_profiles()[::-1]
+
+
+@app.get("/admin/profiles/{name}")
+def get_request_profile(name: str, admin: Principal = Depends(get_current_admin_principal)):
+    path = profiling.profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
+
+
+@app.get("/admin/memory", response_model=MemoryStatus)
+def get_memory_status(admin: Principal = Depends(get_current_admin_principal)):
+    """tracemalloc state, kept snapshots and per-route peak allocations"""
+    return memory_diagnostics.status()
+
+
+@app.post("/admin/memory/tracing", response_model=MemoryStatus)
+def start_memory_tracing(
+    frames: int = Query(MEMORY_TRACE_FRAMES, ge=1, le=100),
+    admin: Principal = Depends(get_current_admin_principal),
+):
+    """Start tracemalloc and take a baseline snapshot"""
+    memory_diagnostics.start(frames)
+    return memory_diagnostics.status()
+
+
+@app.delete("/admin/memory/tracing", response_model=MemoryStatus)
+def stop_memory_tracing(admin: Principal = Depends(get_current_admin_principal)):
+    memory_diagnostics.stop()
+    return memory_diagnostics.status()
+
+
+@app.post("/admin/memory/snapshots", response_model=MemorySnapshotInfo)
+def take_memory_snapshot(admin: Principal = Depends(get_current_admin_principal)):
+    try:
+        return memory_diagnostics.take_snapshot()
+    except NotTracing:
+        raise HTTPException(status_code=409, detail="Memory tracing is not running")
+
+
+@app.get("/admin/memory/diff", response_model=MemoryDiff)
+def diff_memory_snapshots(
+    base: Optional[int] = None,
+    current: Optional[int] = None,
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    limit: int = Query(25, ge=1, le=200),
+    admin: Principal = Depends(get_current_admin_principal),
+):
+    """Top allocation sites by growth; defaults to the oldest snapshot vs now"""
+    try:
+        return memory_diagnostics.diff(base, current, group_by, limit)
+    except NotTracing:
+        raise HTTPException(status_code=409, detail="Memory tracing is not running")
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+
+
 @app.get("/reviews", response_model=ReviewListResponse)
 def get_all_reviews_admin(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
     """Get all reviews for admin panel with pagination"""
-    skip = (page - 1) * limit
-    
     # Get total count
     total = db.query(Review).count()
     total_pages = math.ceil(total / limit)
     
     # Get reviews with college names
-    reviews = (
+    query = (
         db.query(Review, College.name.label('college_name'), User.username.label('user_name'))
         .join(College, Review.college_id == College.id)
         .join(User, Review.user_id == User.id)
-        .order_by(desc(Review.created_at))
-        .offset(skip)
-        .limit(limit)
-        .all()
+    )
+    reviews, next_cursor = keyset_page(
+        query,
+        [Review.created_at, Review.id],
+        key=lambda row: (row[0].created_at, row[0].id),
+        limit=limit,
+        page=page,
+        cursor=cursor,
     )
     
     review_responses = []
@@ -740,7 +925,27 @@ def get_all_reviews_admin(
         reviews=review_responses,
         total=total,
         page=page,
-        pages=total_pages
+        pages=total_pages,
+        next_cursor=next_cursor,
+    )
+
+@app.get("/reviews/export")
+def export_reviews_admin(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    college_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    verified: Optional[bool] = None,
+    admin: Principal = Depends(get_current_admin_principal),
+):
+    """Stream all matching reviews as NDJSON or CSV in one scan (admin)"""
+    statement = review_export_statement(college_id, created_from, created_to, verified)
+    session_factory = read_session_factory(request.headers.get("authorization"))
+    return StreamingResponse(
+        export_reviews(session_factory, statement, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="reviews.{format}"'},
     )
 
 @app.delete("/reviews/{review_id}")
@@ -753,11 +958,11 @@ def delete_review_admin(
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
     
-    # Delete associated likes first
-    db.query(ReviewLike).filter(ReviewLike.review_id == review_id).delete()
-    
-    # Delete the review
+    # Delete the review and its likes
+    likes.delete_review_likes(db, review_id)
     db.delete(review)
+    apply_rating_delta(db, review.college_id, -review.rating, -1)
+    bump_versions(db, college_reviews_version_key(review.college_id))
     db.commit()
     
     return {"message": "Review deleted successfully"}
@@ -769,9 +974,13 @@ def create_college_admin(
 ):
     """Create a new college (admin)"""
     db_college = College(**college.dict())
+    apply_college_facets(db_college)
+    init_college_rating(db, db_college)
     db.add(db_college)
     db.commit()
     db.refresh(db_college)
+    college_index.upsert(db_college)
+    listing_cache.catalog_changed()
     
     return CollegeResponse(
         id=db_college.id,
@@ -812,9 +1021,12 @@ def update_college_admin(
     # Update college fields
     for field, value in college_update.dict(exclude_unset=True).items():
         setattr(db_college, field, value)
+    apply_college_facets(db_college)
     
     db.commit()
     db.refresh(db_college)
+    college_index.upsert(db_college)
+    listing_cache.catalog_changed()
     
     return CollegeResponse(
         id=db_college.id,
@@ -858,12 +1070,46 @@ def delete_college_admin(
     # Delete the college
     db.delete(college)
     db.commit()
+    college_index.remove(college_id)
+    listing_cache.catalog_changed()
     
     return {"message": "College deleted successfully"}
 
+def db_pool_stats():
+    stats = {"sync": pool_stats(engine)}
+    if read_engine is not engine:
+        stats["sync_read"] = pool_stats(read_engine)
+    if async_engine is not None:
+        stats["async"] = pool_stats(async_engine.sync_engine)
+    if async_read_engine is not async_engine:
+        stats["async_read"] = pool_stats(async_read_engine.sync_engine)
+    return stats
+
+
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "timestamp": datetime.now()}
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now(),
+        "auth_cache": principal_cache.stats(),
+        "listing_cache": listing_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "db_pool": db_pool_stats(),
+    }
+
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    # Rendered on the event loop, where the request metrics are updated
+    return PlainTextResponse(
+        metrics.render(
+            pools=db_pool_stats(),
+            caches={"auth": principal_cache.stats(), "listing": listing_cache.stats()},
+            password_hasher=password_hasher.stats(),
+        ),
+        media_type="text/plain; version=0.0.4",
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,199 @@
+"""
+Memory diagnostics with tracemalloc.
+
+Admins switch tracing on and off at runtime through /admin/memory, take
+snapshots, and diff any two of them to get the allocation sites that grew
+most, grouped by line, file or traceback. Starting takes a baseline
+snapshot, so "what has grown since tracing began" is a single diff. The
+newest MEMORY_SNAPSHOTS_KEEP snapshots are kept (a snapshot holds every
+live trace, so they are not cheap).
+
+While tracing, MemoryMiddleware records each request's peak traced memory
+above what was allocated when it started, per route. The peak counter is
+process-wide, so the figure is exact for requests that don't overlap (a
+single client replaying one route) and an estimate under concurrent load.
+
+Tracing slows allocation-heavy code down noticeably and uses memory for
+every trace, so it is off until started and meant to be stopped afterwards.
+When it is off, the middleware costs one is_tracing() call per request.
+"""
+
+import os
+import threading
+import tracemalloc
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from metrics import route_label
+from schemas import AllocationSite, MemoryDiff, MemorySnapshotInfo, MemoryStatus, RouteMemory
+
+MEMORY_TRACE_FRAMES = int(os.getenv("MEMORY_TRACE_FRAMES", 10))
+MEMORY_SNAPSHOTS_KEEP = int(os.getenv("MEMORY_SNAPSHOTS_KEEP", 5))
+
+# Allocations made by the tracing and import machinery, not the app
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+class NotTracing(Exception):
+    pass
+
+
+def rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+class RoutePeaks:
+    __slots__ = ("requests", "max_peak", "total_peak")
+
+    def __init__(self):
+        self.requests = 0
+        self.max_peak = 0
+        self.total_peak = 0
+
+
+class MemoryDiagnostics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots: "OrderedDict[int, Tuple[MemorySnapshotInfo, tracemalloc.Snapshot]]" = (
+            OrderedDict()
+        )
+        self._next_id = 1
+        self._routes: Dict[Tuple[str, str], RoutePeaks] = {}
+
+    def start(self, frames: int = MEMORY_TRACE_FRAMES) -> None:
+        if tracemalloc.is_tracing():
+            return
+        with self._lock:
+            self._snapshots.clear()
+            self._routes.clear()
+        tracemalloc.start(frames)
+        self.take_snapshot()
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        with self._lock:
+            self._snapshots.clear()
+
+    def take_snapshot(self) -> MemorySnapshotInfo:
+        if not tracemalloc.is_tracing():
+            raise NotTracing()
+        snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        traced, _ = tracemalloc.get_traced_memory()
+        with self._lock:
+            info = MemorySnapshotInfo(id=self._next_id, taken_at=datetime.now(), traced_bytes=traced)
+            self._next_id += 1
+            self._snapshots[info.id] = (info, snapshot)
+            while len(self._snapshots) > MEMORY_SNAPSHOTS_KEEP:
+                self._snapshots.popitem(last=False)
+        return info
+
+    def _snapshot(self, snapshot_id: Optional[int]):
+        with self._lock:
+            if snapshot_id is None and self._snapshots:
+                return next(iter(self._snapshots.values()))
+            if snapshot_id in self._snapshots:
+                return self._snapshots[snapshot_id]
+        raise KeyError(snapshot_id)
+
+    def diff(
+        self,
+        base_id: Optional[int] = None,
+        current_id: Optional[int] = None,
+        group_by: str = "lineno",
+        limit: int = 25,
+    ) -> MemoryDiff:
+        """
+        Top allocation sites by growth from base (default: the oldest kept
+        snapshot) to current (default: a new snapshot). Raises KeyError for
+        an unknown snapshot id.
+        """
+        if not tracemalloc.is_tracing():
+            raise NotTracing()
+        base_info, base = self._snapshot(base_id)
+        if current_id is None:
+            current_info, current = self._snapshot(self.take_snapshot().id)
+        else:
+            current_info, current = self._snapshot(current_id)
+
+        sites = []
+        for stat in current.compare_to(base, group_by)[:limit]:
+            sites.append(
+                AllocationSite(
+                    traceback=[f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                    size_bytes=stat.size,
+                    size_diff_bytes=stat.size_diff,
+                    count=stat.count,
+                    count_diff=stat.count_diff,
+                )
+            )
+        return MemoryDiff(base=base_info, current=current_info, group_by=group_by, sites=sites)
+
+    def observe_request(self, method: str, route: str, peak: int) -> None:
+        with self._lock:
+            peaks = self._routes.get((method, route))
+            if peaks is None:
+                peaks = self._routes[(method, route)] = RoutePeaks()
+            peaks.requests += 1
+            peaks.max_peak = max(peaks.max_peak, peak)
+            peaks.total_peak += peak
+
+    def status(self) -> MemoryStatus:
+        tracing = tracemalloc.is_tracing()
+        traced, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            snapshots = [info for info, _ in self._snapshots.values()]
+            routes = [
+                RouteMemory(
+                    method=method,
+                    route=route,
+                    requests=peaks.requests,
+                    max_peak_bytes=peaks.max_peak,
+                    mean_peak_bytes=peaks.total_peak // peaks.requests,
+                )
+                for (method, route), peaks in self._routes.items()
+            ]
+        routes.sort(key=lambda route: route.max_peak_bytes, reverse=True)
+        return MemoryStatus(
+            tracing=tracing,
+            frames=tracemalloc.get_traceback_limit() if tracing else 0,
+            traced_bytes=traced,
+            traced_peak_bytes=peak,
+            tracemalloc_overhead_bytes=tracemalloc.get_tracemalloc_memory(),
+            rss_bytes=rss_bytes(),
+            snapshots=snapshots,
+            routes=routes,
+        )
+
+
+memory_diagnostics = MemoryDiagnostics()
+
+
+class MemoryMiddleware:
+    def __init__(self, app, diagnostics: MemoryDiagnostics = memory_diagnostics):
+        self.app = app
+        self.diagnostics = diagnostics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracemalloc.is_tracing():
+            return await self.app(scope, receive, send)
+
+        started, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if tracemalloc.is_tracing():
+                _, peak = tracemalloc.get_traced_memory()
+                self.diagnostics.observe_request(
+                    scope["method"], route_label(scope), max(0, peak - started)
+                )
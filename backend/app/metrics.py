@@ -0,0 +1,233 @@
+"""
+Prometheus metrics.
+
+MetricsMiddleware records, per route template and method: request counts by
+status, latency, response size, and the time and statements spent in the
+database (from querystats), plus the requests in flight per method. GET
+/metrics renders them in the Prometheus text format together with the
+connection pools' checkout waits, the auth and listing caches' hit ratios
+and the password hasher's queue.
+
+Every update happens in the middleware, on the event loop thread, and
+/metrics renders there too, so the counters are plain ints and floats with no
+locks or atomics; recording a request costs a few dict lookups and two
+bisects. Metrics are per process: with several workers, scrape each one or
+aggregate them in Prometheus.
+"""
+
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from querystats import QueryStats, current_query_stats
+
+# Upper bounds; the last bucket is +Inf
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Label for requests no route matched, so stray paths can't add series
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_label(scope) -> str:
+    """The matched route's template, without convertors, once routing ran."""
+    route = scope.get("route")
+    return route.path_format if route is not None else UNMATCHED_ROUTE
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def samples(self, name: str, labels: str) -> Iterable[str]:
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}'
+        cumulative += self.counts[-1]
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}'
+        yield f"{name}_sum{{{labels}}} {self.sum:.6g}"
+        yield f"{name}_count{{{labels}}} {cumulative}"
+
+
+class RouteMetrics:
+    __slots__ = ("statuses", "duration", "size", "db_time", "db_queries")
+
+    def __init__(self):
+        self.statuses: Dict[int, int] = {}
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.db_time = Histogram(DB_TIME_BUCKETS)
+        self.db_queries = 0
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self.in_flight: Dict[str, int] = {}
+
+    def observe(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        size: int,
+        queries: Optional[QueryStats],
+    ) -> None:
+        metrics = self.routes.get((method, route))
+        if metrics is None:
+            metrics = self.routes[(method, route)] = RouteMetrics()
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+        metrics.duration.observe(seconds)
+        metrics.size.observe(size)
+        if queries is not None:
+            metrics.db_time.observe(queries.seconds)
+            metrics.db_queries += queries.count
+
+    def samples(self) -> Iterable[str]:
+        routes = sorted(self.routes.items())
+        labels = {key: f'method="{key[0]}",route="{_escape(key[1])}"' for key, _ in routes}
+
+        yield from _header("http_requests_total", "counter", "Requests by route, method and status.")
+        for key, metrics in routes:
+            for status, count in sorted(metrics.statuses.items()):
+                yield f'http_requests_total{{{labels[key]},status="{status}"}} {count}'
+
+        for name, attribute, help in (
+            ("http_request_duration_seconds", "duration", "Request latency."),
+            ("http_response_size_bytes", "size", "Response body size."),
+            ("http_request_db_seconds", "db_time", "Time spent in SQL statements per request."),
+        ):
+            yield from _header(name, "histogram", help)
+            for key, metrics in routes:
+                yield from getattr(metrics, attribute).samples(name, labels[key])
+
+        yield from _header("http_request_db_queries_total", "counter", "SQL statements executed.")
+        for key, metrics in routes:
+            yield f"http_request_db_queries_total{{{labels[key]}}} {metrics.db_queries}"
+
+        yield from _header("http_requests_in_flight", "gauge", "Requests being served.")
+        for method, count in sorted(self.in_flight.items()):
+            yield f'http_requests_in_flight{{method="{method}"}} {count}'
+
+
+request_metrics = RequestMetrics()
+
+
+class MetricsMiddleware:
+    def __init__(self, app, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        in_flight = self.metrics.in_flight
+        in_flight[method] = in_flight.get(method, 0) + 1
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_and_measure(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_measure)
+        finally:
+            in_flight[method] -= 1
+            self.metrics.observe(
+                method,
+                route_label(scope),
+                status,
+                time.perf_counter() - started,
+                size,
+                current_query_stats(),
+            )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _header(name: str, kind: str, help: str) -> List[str]:
+    return [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+
+
+def pool_samples(pools: Dict[str, dict]) -> Iterable[str]:
+    """Samples for pooling.pool_stats() results, keyed by pool name."""
+    yield from _header(
+        "db_pool_checkout_wait_seconds", "histogram", "Time to check a connection out."
+    )
+    for name, stats in pools.items():
+        wait = stats.get("checkout_wait_ms")
+        if wait is None:
+            continue
+        for bound, count in wait["buckets"].items():
+            le = bound if bound == "+Inf" else f"{float(bound) / 1000:g}"
+            yield f'db_pool_checkout_wait_seconds_bucket{{pool="{name}",le="{le}"}} {count}'
+        yield f'db_pool_checkout_wait_seconds_sum{{pool="{name}"}} {wait["sum"] / 1000:.6g}'
+        yield f'db_pool_checkout_wait_seconds_count{{pool="{name}"}} {stats["checkouts"]}'
+
+    for metric, key, kind, help in (
+        ("db_pool_checkout_timeouts_total", "checkout_timeouts", "counter", "Checkouts that timed out."),
+        ("db_pool_connections_opened_total", "connections_opened", "counter", "Connections opened."),
+        ("db_pool_size", "size", "gauge", "Configured pool size."),
+        ("db_pool_checked_out", "checked_out", "gauge", "Connections in use."),
+        ("db_pool_overflow", "overflow", "gauge", "Connections open beyond the pool size."),
+    ):
+        yield from _header(metric, kind, help)
+        for name, stats in pools.items():
+            if key in stats:
+                yield f'{metric}{{pool="{name}"}} {stats[key]}'
+
+
+def cache_samples(caches: Dict[str, dict]) -> Iterable[str]:
+    """Samples for lru.TTLCache.stats() results, keyed by cache name."""
+    for metric, key, kind, help in (
+        ("cache_hits_total", "hits", "counter", "Cache lookups that hit."),
+        ("cache_misses_total", "misses", "counter", "Cache lookups that missed."),
+        ("cache_hit_ratio", "hit_rate", "gauge", "Hits over lookups since start."),
+        ("cache_entries", "size", "gauge", "Entries held."),
+        ("cache_evictions_total", "evictions", "counter", "Entries evicted for space."),
+        ("cache_invalidations_total", "invalidations", "counter", "Entries dropped by writes."),
+    ):
+        yield from _header(metric, kind, help)
+        for name, stats in caches.items():
+            yield f'{metric}{{cache="{name}"}} {stats[key]}'
+
+
+def password_hasher_samples(stats: dict) -> Iterable[str]:
+    for metric, key, kind, help in (
+        ("password_hash_pending", "pending", "gauge", "Hash jobs queued or running."),
+        ("password_hash_completed_total", "completed", "counter", "Hash jobs finished."),
+        ("password_hash_rejected_total", "rejected", "counter", "Hash jobs refused as overloaded."),
+    ):
+        yield from _header(metric, kind, help)
+        yield f"{metric} {stats[key]}"
+
+
+def render(pools: Dict[str, dict], caches: Dict[str, dict], password_hasher: dict) -> str:
+    lines = [
+        *request_metrics.samples(),
+        *pool_samples(pools),
+        *cache_samples(caches),
+        *password_hasher_samples(password_hasher),
+    ]
+    return "\n".join(lines) + "\n"
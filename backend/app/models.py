@@ -8,6 +8,8 @@ from sqlalchemy import (
     Boolean,
     ForeignKey,
     JSON,
+    Index,
+    UniqueConstraint,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -58,13 +60,45 @@ class College(Base):
     facilities = Column(JSON)  # Array of facilities
     average_rating = Column(Float, default=0.0)
     total_reviews = Column(Integer, default=0)
+    rating_sum = Column(Float, default=0.0, nullable=False)  # Running sum of review ratings
+    rating_count = Column(Integer, default=0, nullable=False)
+    weighted_score = Column(Float, default=0.0)  # Bayesian rank, see ratings.py
     college_metadata = Column(JSON)  # Flexible field for additional data
+    # Typed copies of college_metadata facets so listings can filter in SQL
+    min_fee = Column(Integer, index=True)
+    max_fee = Column(Integer, index=True)
+    scholarships_available = Column(Boolean, default=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
     reviews = relationship("Review", back_populates="college")
     saved_by_users = relationship("SavedCollege", back_populates="college")
+    stream_facets = relationship(
+        "CollegeStream", back_populates="college", cascade="all, delete-orphan"
+    )
+
+    # One index per listing sort mode, scanned backwards for DESC order
+    __table_args__ = (
+        Index("ix_colleges_sort_highest", "average_rating", "total_reviews", "id"),
+        Index("ix_colleges_sort_most", "total_reviews", "average_rating", "id"),
+        Index("ix_colleges_sort_weighted", "weighted_score", "total_reviews", "id"),
+    )
+
+
+class CollegeStream(Base):
+    __tablename__ = "college_streams"
+
+    college_id = Column(
+        Integer, ForeignKey("colleges.id", ondelete="CASCADE"), primary_key=True
+    )
+    stream = Column(String, primary_key=True)  # Lowercased, e.g. "science"
+
+    # Relationships
+    college = relationship("College", back_populates="stream_facets")
+
+    # Stream lookups go stream -> college ids
+    __table_args__ = (Index("ix_college_streams_stream", "stream", "college_id"),)
 
 
 class Review(Base):
@@ -87,14 +121,29 @@ class Review(Base):
     # Relationships
     user = relationship("User", back_populates="reviews")
     college = relationship("College", back_populates="reviews")
-    likes = relationship("ReviewLike", back_populates="review")
+    # ON DELETE CASCADE removes the likes; the ORM doesn't load them first
+    likes = relationship(
+        "ReviewLike",
+        back_populates="review",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    # Keyset pagination keys, newest first
+    __table_args__ = (
+        Index("ix_reviews_college_created", "college_id", "created_at", "id"),
+        Index("ix_reviews_user_created", "user_id", "created_at", "id"),
+        Index("ix_reviews_created", "created_at", "id"),
+    )
 
 
 class ReviewLike(Base):
     __tablename__ = "review_likes"
 
     id = Column(Integer, primary_key=True, index=True)
-    review_id = Column(Integer, ForeignKey("reviews.id"), nullable=False)
+    review_id = Column(
+        Integer, ForeignKey("reviews.id", ondelete="CASCADE"), nullable=False
+    )
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -102,8 +151,12 @@ class ReviewLike(Base):
     review = relationship("Review", back_populates="likes")
     user = relationship("User", back_populates="review_likes")
 
-    # Ensure unique constraint
-    __table_args__ = ({"sqlite_autoincrement": True},)
+    # One like per user per review
+    __table_args__ = (
+        UniqueConstraint("review_id", "user_id", name="uq_review_likes_review_user"),
+        Index("ix_review_likes_user_created", "user_id", "created_at", "id"),
+        {"sqlite_autoincrement": True},
+    )
 
 
 class SavedCollege(Base):
@@ -118,5 +171,19 @@ class SavedCollege(Base):
     user = relationship("User", back_populates="saved_colleges")
     college = relationship("College", back_populates="saved_by_users")
 
-    # Ensure unique constraint
-    __table_args__ = ({"sqlite_autoincrement": True},)
+    # One save per user per college
+    __table_args__ = (
+        UniqueConstraint("user_id", "college_id", name="uq_saved_colleges_user_college"),
+        Index("ix_saved_colleges_user_created", "user_id", "created_at", "id"),
+        Index("ix_saved_colleges_college", "college_id"),
+        {"sqlite_autoincrement": True},
+    )
+
+
+class ContentVersion(Base):
+    """Counters that writes bump to version cached responses, see versions.py."""
+
+    __tablename__ = "content_versions"
+
+    key = Column(String, primary_key=True)  # e.g. "catalog", "college_reviews:12"
+    version = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,97 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Lists are ordered newest first on a (created_at, id) style key. Instead of
+OFFSET, a client can pass back the opaque next_cursor of the previous page and
+the next page starts right after that key, so every page costs the same index
+range scan and rows don't shift between requests. The page parameter keeps
+working for old clients; both modes return next_cursor.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import DateTime, desc, func, literal, tuple_
+
+
+def encode_cursor(values: Sequence) -> str:
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Decode a cursor made by encode_cursor. Strings are read back as datetimes."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != size:
+            raise ValueError(cursor)
+        return [datetime.fromisoformat(v) if isinstance(v, str) else v for v in payload]
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _comparable(expression, dialect_name: str):
+    # SQLite keeps datetimes as text in more than one format (CURRENT_TIMESTAMP
+    # has no fractional seconds), so compare them as julian days there
+    if dialect_name == "sqlite" and isinstance(expression.type, DateTime):
+        return func.julianday(expression)
+    return expression
+
+
+def keyset_window(
+    query,
+    sort_columns: Sequence,
+    limit: int,
+    page: int,
+    cursor: Optional[str],
+    dialect_name: str,
+):
+    """
+    Order a Query or Select by sort_columns, descending, and restrict it to the
+    requested page plus one extra row that tells whether another page follows.
+    The last sort column must be unique (normally the primary key).
+    """
+    keys = [_comparable(column, dialect_name) for column in sort_columns]
+    query = query.order_by(*[desc(key_column) for key_column in keys])
+    if cursor:
+        after = decode_cursor(cursor, len(sort_columns))
+        bounds = [
+            _comparable(literal(value, column.type), dialect_name)
+            for column, value in zip(sort_columns, after)
+        ]
+        query = query.filter(tuple_(*keys) < tuple_(*bounds))
+    else:
+        query = query.offset((page - 1) * limit)
+    return query.limit(limit + 1)
+
+
+def split_page(
+    rows: List, key: Callable[[object], Tuple], limit: int
+) -> Tuple[List, Optional[str]]:
+    """Trim the extra row fetched by keyset_window and build the next cursor."""
+    next_cursor = encode_cursor(key(rows[limit - 1])) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def keyset_page(
+    query,
+    sort_columns: Sequence,
+    key: Callable[[object], Tuple],
+    limit: int,
+    page: int = 1,
+    cursor: Optional[str] = None,
+) -> Tuple[List, Optional[str]]:
+    """
+    Fetch one page of query ordered by sort_columns, descending. key extracts
+    the sort values from a result row. Returns the rows and the cursor of the
+    next page, or None on the last page.
+    """
+    dialect_name = query.session.get_bind().dialect.name
+    window = keyset_window(query, sort_columns, limit, page, cursor, dialect_name)
+    return split_page(window.all(), key, limit)
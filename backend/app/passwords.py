@@ -0,0 +1,110 @@
+"""
+bcrypt hashing off the request threadpool.
+
+A bcrypt hash or verify costs 100-300 ms of CPU. Run inline in sync handlers,
+a burst of logins occupies the shared threadpool and every other endpoint
+queues behind it. Hashing and verification run instead on a dedicated
+process pool of PASSWORD_HASH_WORKERS processes (default: one per core), and
+at most PASSWORD_HASH_MAX_PENDING jobs may be queued or running. Past that,
+requests fail fast with 503 and a Retry-After header instead of piling up.
+
+PASSWORD_HASH_WORKERS=0 runs the jobs in the threadpool, with the same
+admission limit, for environments where a process pool is unwanted.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+PASSWORD_HASH_MAX_PENDING = int(
+    os.getenv("PASSWORD_HASH_MAX_PENDING", max(PASSWORD_HASH_WORKERS, 1) * 8)
+)
+PASSWORD_HASH_RETRY_AFTER_SECONDS = int(os.getenv("PASSWORD_HASH_RETRY_AFTER_SECONDS", 2))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    def __init__(
+        self,
+        workers: int = PASSWORD_HASH_WORKERS,
+        max_pending: int = PASSWORD_HASH_MAX_PENDING,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._executor is None and self.workers > 0:
+                # spawn, not fork: the API process has threads by now
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many sign-in requests in progress, please retry shortly",
+                    headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+                )
+            self._pending += 1
+        try:
+            if self.workers <= 0:
+                return await run_in_threadpool(fn, *args)
+            self.start()
+            return await asyncio.wrap_future(self._executor.submit(fn, *args))
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+password_hasher = PasswordHasher()
+
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.run(_hash, password)
+
+
+async def check_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.run(_verify, plain_password, hashed_password)
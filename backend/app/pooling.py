@@ -0,0 +1,164 @@
+"""
+Connection pool settings and instrumentation.
+
+Pool sizing comes from the environment (DB_POOL_*). Every engine created via
+pool_options() gets an InstrumentedQueuePool, which records how long each
+checkout waited (including opening a new connection or pre-pinging), how
+often checkout timed out, and the age of open connections. pool_stats()
+reports them with the pool's own size/checked-out/overflow counts.
+
+Sync handlers hold their connection across threadpool hops, so keep
+DB_POOL_SIZE + DB_MAX_OVERFLOW at or above the threadpool size (40 by
+default) or saturated checkouts can stall until DB_POOL_TIMEOUT.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+# Seconds; -1 never recycles
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+
+# Upper bounds in milliseconds
+CHECKOUT_WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class PoolMonitor:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wait_counts = [0] * (len(CHECKOUT_WAIT_BUCKETS_MS) + 1)
+        self._wait_sum_ms = 0.0
+        self._wait_max_ms = 0.0
+        self._opened_at: Dict[int, float] = {}
+        self.timeouts = 0
+        self.connects = 0
+        self.closes = 0
+
+    def observe_wait(self, seconds: float) -> None:
+        wait_ms = seconds * 1000
+        with self._lock:
+            self._wait_counts[bisect_left(CHECKOUT_WAIT_BUCKETS_MS, wait_ms)] += 1
+            self._wait_sum_ms += wait_ms
+            self._wait_max_ms = max(self._wait_max_ms, wait_ms)
+
+    def observe_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def attach(self, pool) -> None:
+        @event.listens_for(pool, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            with self._lock:
+                self.connects += 1
+                self._opened_at[id(connection_record)] = time.monotonic()
+
+        @event.listens_for(pool, "close")
+        def on_close(dbapi_connection, connection_record):
+            with self._lock:
+                self.closes += 1
+                self._opened_at.pop(id(connection_record), None)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            ages = [now - opened for opened in self._opened_at.values()]
+            checkouts = sum(self._wait_counts)
+            histogram = {}
+            cumulative = 0
+            for bound, count in zip(CHECKOUT_WAIT_BUCKETS_MS, self._wait_counts):
+                cumulative += count
+                histogram[str(bound)] = cumulative
+            histogram["+Inf"] = checkouts
+            return {
+                "checkouts": checkouts,
+                "checkout_timeouts": self.timeouts,
+                "checkout_wait_ms": {
+                    "sum": round(self._wait_sum_ms, 3),
+                    "max": round(self._wait_max_ms, 3),
+                    "mean": round(self._wait_sum_ms / checkouts, 3) if checkouts else 0.0,
+                    # Cumulative counts per upper bound, Prometheus-style
+                    "buckets": histogram,
+                },
+                "connections_opened": self.connects,
+                "connections_closed": self.closes,
+                "connection_age_seconds": {
+                    "max": round(max(ages), 1) if ages else 0.0,
+                    "mean": round(sum(ages) / len(ages), 1) if ages else 0.0,
+                },
+            }
+
+
+class _InstrumentedPoolMixin:
+    monitor: PoolMonitor
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.monitor.observe_timeout()
+            raise
+        self.monitor.observe_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep the same monitor
+        pool = super().recreate()
+        pool.monitor = self.monitor
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_options(url: str, async_engine: bool = False) -> dict:
+    """create_engine() keyword arguments for the configured pool."""
+    if url.startswith("sqlite") and (async_engine or ":memory:" in url):
+        # aiosqlite and in-memory SQLite keep their dialect's default pools
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if async_engine else InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def instrument_engine(engine) -> None:
+    pool = engine.pool
+    if isinstance(pool, _InstrumentedPoolMixin):
+        pool.monitor = PoolMonitor()
+        pool.monitor.attach(pool)
+
+
+def pool_stats(engine) -> dict:
+    pool = engine.pool
+    stats = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    if isinstance(pool, _InstrumentedPoolMixin):
+        stats.update(pool.monitor.stats())
+    return stats
@@ -0,0 +1,68 @@
+"""
+Cache of resolved principals for authenticated requests.
+
+Most handlers only need the caller's id, username and is_active, yet
+resolving a bearer token used to cost a SELECT on users per request. The
+principal for a token subject is kept in a bounded LRU with a TTL, so a
+logged-in user browsing the app is resolved without touching the database.
+
+Entries are dropped when a User row is updated through the ORM (profile
+edits, deactivation), once the transaction commits. That invalidation is
+per process: other workers see the change after AUTH_CACHE_TTL_SECONDS at
+most. Bulk query.update() calls on users bypass it.
+"""
+
+import os
+from typing import NamedTuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from lru import TTLCache
+from models import User
+
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", 10000))
+# 0 disables the cache
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", 60))
+
+
+class Principal(NamedTuple):
+    id: int
+    username: str
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, username=user.username, is_active=user.is_active)
+
+
+class PrincipalCache(TTLCache):
+    def __init__(self, max_size: int = AUTH_CACHE_SIZE, ttl: float = AUTH_CACHE_TTL_SECONDS):
+        super().__init__(max_size, ttl)
+
+    def invalidate(self, subject: str) -> None:
+        self.discard(subject)
+
+
+principal_cache = PrincipalCache()
+
+_PENDING_KEY = "principal_invalidations"
+
+
+@event.listens_for(User, "after_update")
+def _collect_updated_user(mapper, connection, target):
+    # Usernames are the cache key; also drop the old one if it changed
+    subjects = {target.username, *inspect(target).attrs.username.history.deleted}
+    session = Session.object_session(target)
+    session.info.setdefault(_PENDING_KEY, set()).update(subjects)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session):
+    for subject in session.info.pop(_PENDING_KEY, ()):
+        principal_cache.invalidate(subject)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_users(session):
+    session.info.pop(_PENDING_KEY, None)
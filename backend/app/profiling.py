@@ -0,0 +1,170 @@
+"""
+Opt-in per-request CPU profiles.
+
+A request is profiled when it carries an X-Profile header and a bearer token
+for one of ADMIN_USERNAMES, or when it falls in the random PROFILE_SAMPLE_RATE
+fraction of all traffic (0 by default). The handler runs under cProfile and
+the result is written as a pstats file to PROFILE_DIR, which keeps the newest
+PROFILE_KEEP files. The response names the file in X-Profile-Id; admins list
+and download them from /admin/profiles. Open them with `python -m pstats` or
+snakeviz.
+
+Handlers are wrapped through ProfilingRoute, the route class of the app and
+the async router, so a sync handler is profiled in the threadpool thread
+that runs it and the profile covers only that request: ORM loading, response
+model construction, time waiting on the database. Dependencies and
+FastAPI's response validation and encoding are not included. cProfile follows a thread, not a task, so an async handler's
+profile also picks up whatever else the event loop runs while it awaits,
+and only one async handler is profiled at a time.
+
+With profiling off, the cost is one header scan per request and one
+context variable lookup per handler call.
+"""
+
+import asyncio
+import cProfile
+import functools
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+
+from auth import is_admin, token_subject
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/udaan-profiles")
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", 200))
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_HEADER = b"x-profile"
+
+PROFILE_NAME = re.compile(r"^[\w.-]+\.prof$")
+
+
+class RequestProfile:
+    def __init__(self, method: str, path: str):
+        slug = re.sub(r"[^\w]+", "_", path).strip("_") or "root"
+        now = time.time()
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(now)) + f"{int(now * 1000) % 1000:03d}"
+        self.name = f"{stamp}-{uuid.uuid4().hex[:8]}-{method}-{slug[:80]}.prof"
+        self.profiler: Optional[cProfile.Profile] = None
+
+    @contextmanager
+    def capture(self):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self.profiler = profiler
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+# cProfile replaces the thread's profile hook, so async captures can't nest
+_loop_profiling = threading.Lock()
+
+
+def profiled(call):
+    """Wrap an endpoint so it runs under the request's profile, if it has one."""
+    if asyncio.iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def async_endpoint(*args, **kwargs):
+            profile = _current.get()
+            if profile is None or not _loop_profiling.acquire(blocking=False):
+                return await call(*args, **kwargs)
+            try:
+                with profile.capture():
+                    return await call(*args, **kwargs)
+            finally:
+                _loop_profiling.release()
+
+        return async_endpoint
+
+    @functools.wraps(call)
+    def endpoint(*args, **kwargs):
+        profile = _current.get()
+        if profile is None:
+            return call(*args, **kwargs)
+        with profile.capture():
+            return call(*args, **kwargs)
+
+    return endpoint
+
+
+class ProfilingRoute(APIRoute):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The request handler reads dependant.call on every request
+        self.dependant.call = profiled(self.dependant.call)
+
+
+def wants_profile(scope) -> bool:
+    if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        return True
+    requested = False
+    authorization = None
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            requested = True
+        elif name == b"authorization":
+            authorization = value.decode("latin-1")
+    return requested and is_admin(token_subject(authorization))
+
+
+def save_profile(profile: RequestProfile) -> None:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profile.profiler.dump_stats(os.path.join(PROFILE_DIR, profile.name))
+    # Names start with a timestamp, so the oldest sort first
+    names = list_profiles()
+    for name in names[: max(0, len(names) - PROFILE_KEEP)]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, name))
+        except FileNotFoundError:
+            pass
+
+
+def list_profiles() -> List[str]:
+    try:
+        return sorted(name for name in os.listdir(PROFILE_DIR) if PROFILE_NAME.match(name))
+    except FileNotFoundError:
+        return []
+
+
+def profile_path(name: str) -> Optional[str]:
+    if not PROFILE_NAME.match(name):
+        return None
+    path = os.path.join(PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not wants_profile(scope):
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        token = _current.set(profile)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start" and profile.profiler is not None:
+                MutableHeaders(scope=message).append("X-Profile-Id", profile.name)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _current.reset(token)
+            if profile.profiler is not None:
+                await run_in_threadpool(save_profile, profile)
@@ -0,0 +1,142 @@
+"""
+Per-request SQL statement counts and timings.
+
+instrument_queries() hooks an engine's cursor events, and QueryStatsMiddleware
+gives every HTTP request a QueryStats that those events add to (a context
+variable, so it follows the request into the threadpool and the async
+handlers' greenlets). After the response:
+
+- with DB_QUERY_HEADERS on, the response carries X-DB-Queries (statements
+  executed) and X-DB-Time (milliseconds spent in them);
+- requests slower than SLOW_REQUEST_MS are logged with their counts;
+- a statement executed DB_REPEATED_QUERY_THRESHOLD or more times in one
+  request is logged as a likely N+1 loop, whatever the request's latency.
+
+The headers only cover statements run before the response starts, so a
+streamed body's queries are left out. count_queries() collects the same
+stats around any block of code, for scripts and checks that call functions
+directly.
+"""
+
+import logging
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+DB_QUERY_HEADERS = os.getenv("DB_QUERY_HEADERS", "false").lower() in ("1", "true", "yes")
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", 1000))
+DB_REPEATED_QUERY_THRESHOLD = int(os.getenv("DB_REPEATED_QUERY_THRESHOLD", 10))
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        # Statement text -> executions; parameters differ, the SQL doesn't
+        self.statements = Counter()
+
+    def observe(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int = DB_REPEATED_QUERY_THRESHOLD) -> List[Tuple[str, int]]:
+        """Statements run at least threshold times, most repeated first."""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def instrument_queries(engine) -> None:
+    """Count and time every statement engine runs (sync engines; pass .sync_engine)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        if stats is not None:
+            started = getattr(context, "_query_started", None)
+            stats.observe(statement, time.perf_counter() - started if started else 0.0)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _shorten(statement: str, length: int = 200) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= length else statement[:length] + "..."
+
+
+def report(method: str, path: str, status: Optional[int], elapsed: float, stats: QueryStats):
+    for statement, times in stats.repeated():
+        logger.warning(
+            "Possible N+1: %s %s ran a statement %d times: %s",
+            method,
+            path,
+            times,
+            _shorten(statement),
+        )
+    if elapsed * 1000 >= SLOW_REQUEST_MS:
+        logger.warning(
+            "Slow request: %s %s -> %s in %.0f ms, %d queries in %.0f ms",
+            method,
+            path,
+            status,
+            elapsed * 1000,
+            stats.count,
+            stats.seconds * 1000,
+        )
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = QueryStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = None
+
+        async def send_with_stats(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if DB_QUERY_HEADERS:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Queries"] = str(stats.count)
+                    headers["X-DB-Time"] = f"{stats.seconds * 1000:.1f}"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            report(scope["method"], scope["path"], status, time.perf_counter() - started, stats)
@@ -0,0 +1,202 @@
+"""
+College rating aggregates and the Bayesian weighted score.
+
+Colleges keep a running rating_sum/rating_count. Review writes shift them with
+a single atomic UPDATE ... SET x = x + :delta that also re-derives
+average_rating, total_reviews and weighted_score from the new values, so a
+write costs the same however many reviews the college has, and concurrent
+writes can't lose updates. All listing sort modes are then indexed ORDER BYs
+over the stored columns.
+
+weighted_score = (v * R + m * C) / (v + m), where v is the review count, R the
+college's average rating, m the prior weight and C the mean rating of all
+reviewed colleges. C moves slowly, so it is cached per process. A background
+task refreshes it every WEIGHTED_PRIOR_TTL_SECONDS and, when it has drifted
+past a tolerance, rescores the whole catalog in one UPDATE of its own; review
+writes only read the cached value and update their own college's row.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Optional
+
+from sqlalchemy import Numeric, case, cast, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from starlette.concurrency import run_in_threadpool
+
+from database import SessionLocal
+from listing_cache import listing_cache
+from models import College, Review
+
+logger = logging.getLogger(__name__)
+
+WEIGHTED_PRIOR_M = int(os.getenv("WEIGHTED_PRIOR_M", 5))
+WEIGHTED_PRIOR_TTL_SECONDS = float(os.getenv("WEIGHTED_PRIOR_TTL_SECONDS", 300))
+WEIGHTED_RESCORE_TOLERANCE = float(os.getenv("WEIGHTED_RESCORE_TOLERANCE", 0.01))
+
+_prior_lock = threading.Lock()
+_prior = {"mean": None, "scored_mean": None}
+
+
+def weighted_score(v: int, R: float, c_mean: float, m: int = WEIGHTED_PRIOR_M) -> float:
+    v = v or 0
+    R = R or 0.0
+    return (v / (v + m)) * R + (m / (v + m)) * c_mean if (v + m) > 0 else R
+
+
+def weighted_score_expression(c_mean: float, m: int = WEIGHTED_PRIOR_M, v=None, R=None):
+    """SQL form of weighted_score(), over the College columns by default."""
+    if v is None:
+        v = func.coalesce(College.total_reviews, 0)
+    if R is None:
+        R = func.coalesce(College.average_rating, 0.0)
+    return (v * R + m * c_mean) / (v + m)
+
+
+def catalog_mean(db: Session) -> float:
+    mean = (
+        db.query(func.avg(College.average_rating))
+        .filter(College.total_reviews > 0)
+        .scalar()
+    )
+    return float(mean) if mean is not None else 0.0
+
+
+def rescore_catalog(db: Session, c_mean: Optional[float] = None) -> float:
+    """Recompute weighted_score for every college in one statement."""
+    if c_mean is None:
+        c_mean = catalog_mean(db)
+    db.execute(
+        update(College).values(weighted_score=weighted_score_expression(c_mean))
+    )
+    listing_cache.catalog_rescored()
+    with _prior_lock:
+        _prior.update(mean=c_mean, scored_mean=c_mean)
+    return c_mean
+
+
+def prior_mean(db: Session) -> float:
+    """
+    The cached catalog mean used as the prior. Only loaded here when nothing
+    has refreshed it yet (scripts, or a request racing the startup refresh).
+    """
+    with _prior_lock:
+        if _prior["mean"] is not None:
+            return _prior["mean"]
+    c_mean = catalog_mean(db)
+    with _prior_lock:
+        if _prior["mean"] is None:
+            _prior.update(mean=c_mean)
+        return _prior["mean"]
+
+
+def refresh_prior_mean(db: Session) -> float:
+    """
+    Reload the catalog mean, rescoring the catalog if it has drifted from the
+    mean the stored scores were computed with. The caller commits.
+    """
+    c_mean = catalog_mean(db)
+    with _prior_lock:
+        scored_mean = _prior["scored_mean"]
+    if scored_mean is None or abs(c_mean - scored_mean) > WEIGHTED_RESCORE_TOLERANCE:
+        return rescore_catalog(db, c_mean)
+    with _prior_lock:
+        _prior.update(mean=c_mean)
+    return c_mean
+
+
+def refresh_catalog_scores() -> None:
+    db = SessionLocal()
+    try:
+        refresh_prior_mean(db)
+        db.commit()
+    finally:
+        db.close()
+
+
+async def keep_catalog_scores_fresh():
+    """Refresh the prior every WEIGHTED_PRIOR_TTL_SECONDS (0 disables)."""
+    while WEIGHTED_PRIOR_TTL_SECONDS > 0:
+        await asyncio.sleep(WEIGHTED_PRIOR_TTL_SECONDS)
+        try:
+            await run_in_threadpool(refresh_catalog_scores)
+        except Exception:
+            logger.exception("Failed to refresh the weighted score prior")
+
+
+def init_college_rating(db: Session, college: College) -> None:
+    """Give a new college the scores of an unreviewed one."""
+    college.rating_sum = 0.0
+    college.rating_count = 0
+    college.average_rating = 0.0
+    college.total_reviews = 0
+    college.weighted_score = prior_mean(db)
+
+
+def apply_rating_delta(
+    db: Session, college_id: int, sum_delta: float, count_delta: int
+) -> None:
+    """
+    Shift a college's rating aggregates by a review write. Everything is
+    computed from the row's current values inside one UPDATE, so concurrent
+    writers serialize on the row lock instead of overwriting each other.
+    """
+    c_mean = prior_mean(db)
+    rating_sum = College.rating_sum + sum_delta
+    rating_count = College.rating_count + count_delta
+    average_rating = case(
+        (rating_count > 0, func.round(cast(rating_sum / rating_count, Numeric), 1)),
+        else_=0.0,
+    )
+    db.query(College).filter(College.id == college_id).update(
+        {
+            College.rating_sum: rating_sum,
+            College.rating_count: rating_count,
+            College.total_reviews: rating_count,
+            College.average_rating: average_rating,
+            College.weighted_score: weighted_score_expression(
+                c_mean, v=rating_count, R=average_rating
+            ),
+        },
+        synchronize_session=False,
+    )
+    listing_cache.colleges_rated([college_id])
+
+
+def recompute_college_ratings(db: Session) -> None:
+    """
+    Rebuild every college's rating aggregates from its reviews with set-based
+    UPDATEs (one GROUP BY over reviews), then rescore the catalog. For bulk
+    loads that bypass apply_rating_delta.
+    """
+    totals = (
+        select(
+            Review.college_id,
+            func.sum(Review.rating).label("rating_sum"),
+            func.count(Review.id).label("rating_count"),
+        )
+        .group_by(Review.college_id)
+        .subquery()
+    )
+    db.execute(
+        update(College).values(
+            rating_sum=0.0, rating_count=0, total_reviews=0, average_rating=0.0
+        )
+    )
+    db.execute(
+        update(College)
+        .where(College.id == totals.c.college_id)
+        .values(
+            rating_sum=totals.c.rating_sum,
+            rating_count=totals.c.rating_count,
+            total_reviews=totals.c.rating_count,
+            average_rating=func.round(
+                cast(totals.c.rating_sum / totals.c.rating_count, Numeric), 1
+            ),
+        )
+    )
+    listing_cache.catalog_changed()
+    rescore_catalog(db)
@@ -0,0 +1,106 @@
+"""
+Read-replica routing.
+
+When READ_DATABASE_URL is set, read-only handlers take their session from
+get_read_db / get_async_read_db, which is bound to the replica. Writes keep
+using get_db on the primary. Add replicas behind READ_DATABASE_URL (e.g. a
+pgbouncer or load balancer in front of several) to scale reads.
+
+Read-your-writes: ReadYourWritesMiddleware notes the token subject of every
+successful POST/PUT/PATCH/DELETE, and for READ_YOUR_WRITES_SECONDS afterwards
+that user's reads go to the primary, so they don't miss their own write
+while the replica catches up. Set the window above the replica's usual lag.
+The window is tracked per process, like the other caches here; with several
+workers, route a user to the same worker or size the window generously.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from fastapi import Request
+from starlette.datastructures import Headers
+
+from auth import token_subject
+from database import (
+    READ_DATABASE_URL,
+    AsyncReadSessionLocal,
+    AsyncSessionLocal,
+    ReadSessionLocal,
+    SessionLocal,
+)
+
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+class RecentWriters:
+    def __init__(self, window: float = READ_YOUR_WRITES_SECONDS):
+        self.window = window
+        self._lock = threading.Lock()
+        self._until: Dict[str, float] = {}
+
+    def mark(self, subject: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._until[subject] = now + self.window
+            if len(self._until) > 10000:
+                self._until = {s: t for s, t in self._until.items() if t > now}
+
+    def wrote_recently(self, subject: Optional[str]) -> bool:
+        if subject is None:
+            return False
+        with self._lock:
+            until = self._until.get(subject)
+        return until is not None and until > time.monotonic()
+
+
+recent_writers = RecentWriters()
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            return await self.app(scope, receive, send)
+
+        async def send_and_mark(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                subject = token_subject(Headers(scope=scope).get("authorization"))
+                if subject is not None:
+                    recent_writers.mark(subject)
+            await send(message)
+
+        await self.app(scope, receive, send_and_mark)
+
+
+def use_primary(authorization: Optional[str]) -> bool:
+    return READ_DATABASE_URL is None or recent_writers.wrote_recently(
+        token_subject(authorization)
+    )
+
+
+def read_session_factory(authorization: Optional[str]):
+    return SessionLocal if use_primary(authorization) else ReadSessionLocal
+
+
+def get_read_db(request: Request):
+    db = read_session_factory(request.headers.get("authorization"))()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    session_factory = (
+        AsyncSessionLocal
+        if use_primary(request.headers.get("authorization"))
+        else AsyncReadSessionLocal
+    )
+    async with session_factory() as db:
+        yield db
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import date, datetime
 
 
 # User Schemas
@@ -107,6 +107,22 @@ class CollegeResponse(CollegeBase):
         from_attributes = True
 
 
+class CollegeImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class CollegeImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[CollegeImportError]
+
+
+class CollegeSuggestion(BaseModel):
+    id: int
+    name: str
+
+
 # Review Schemas
 class ReviewBase(BaseModel):
     rating: float
@@ -174,6 +190,7 @@ class ReviewListResponse(BaseModel):
     total: int
     page: int
     pages: int
+    next_cursor: Optional[str] = None
 
 
 class CollegeListResponse(BaseModel):
@@ -191,3 +208,66 @@ class SavedCollegeListResponse(BaseModel):
     total: int
     page: int
     pages: int
+    next_cursor: Optional[str] = None
+
+
+# Admin Schemas
+class DailyActivity(BaseModel):
+    day: date
+    new_users: int = 0
+    new_reviews: int = 0
+    new_likes: int = 0
+
+
+class AdminStats(BaseModel):
+    total_colleges: int
+    total_reviews: int
+    total_users: int
+    total_likes: int
+    total_saves: int
+    average_rating: float
+    daily: List[DailyActivity]
+    recent_reviews: List[ReviewResponse]
+    recent_colleges: List[CollegeResponse]
+    generated_at: datetime
+
+
+class MemorySnapshotInfo(BaseModel):
+    id: int
+    taken_at: datetime
+    traced_bytes: int
+
+
+class AllocationSite(BaseModel):
+    # file:line of the allocation, innermost frame first when grouped by traceback
+    traceback: List[str]
+    size_bytes: int
+    size_diff_bytes: int
+    count: int
+    count_diff: int
+
+
+class MemoryDiff(BaseModel):
+    base: MemorySnapshotInfo
+    current: MemorySnapshotInfo
+    group_by: str
+    sites: List[AllocationSite]
+
+
+class RouteMemory(BaseModel):
+    method: str
+    route: str
+    requests: int
+    max_peak_bytes: int
+    mean_peak_bytes: int
+
+
+class MemoryStatus(BaseModel):
+    tracing: bool
+    frames: int
+    traced_bytes: int
+    traced_peak_bytes: int
+    tracemalloc_overhead_bytes: int
+    rss_bytes: Optional[int] = None
+    snapshots: List[MemorySnapshotInfo]
+    routes: List[RouteMemory]
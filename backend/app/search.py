@@ -0,0 +1,67 @@
+"""
+College text search.
+
+On PostgreSQL the search term is matched against a full-text document built
+from name, location, affiliation and programs, plus pg_trgm word similarity on
+name and location so misspellings like "Kathmadu" still match. Both are backed
+by GIN expression indexes (see the search migration), and results are ranked
+by relevance. Other databases fall back to the old name ILIKE match.
+"""
+
+from typing import Optional, Tuple
+
+from sqlalchemy import Text, cast, func, literal, literal_column, or_
+
+from models import College
+
+SEARCH_TS_CONFIG = "simple"
+
+
+def search_document():
+    """
+    The tsvector the GIN index is built on. Keep this in sync with
+    ix_colleges_search_document, or the planner won't use the index.
+    """
+    empty = literal_column("''")
+    space = literal_column("' '")
+    text = (
+        func.coalesce(College.name, empty)
+        .concat(space)
+        .concat(func.coalesce(College.location, empty))
+        .concat(space)
+        .concat(func.coalesce(College.affiliation, empty))
+        .concat(space)
+        .concat(func.coalesce(cast(College.programs, Text), empty))
+    )
+    return func.to_tsvector(literal_column(f"'{SEARCH_TS_CONFIG}'::regconfig"), text)
+
+
+def ilike_search(query, term: str):
+    return query.filter(College.name.ilike(f"%{term}%"))
+
+
+def apply_search(query, term: str, dialect_name: str) -> Tuple[object, Optional[object]]:
+    """
+    Filter a College query by a search term. Returns the query and a relevance
+    expression to order by, which is None when the dialect can't rank.
+    """
+    if dialect_name != "postgresql":
+        return ilike_search(query, term), None
+
+    document = search_document()
+    ts_query = func.websearch_to_tsquery(
+        literal_column(f"'{SEARCH_TS_CONFIG}'::regconfig"), term
+    )
+    term_literal = literal(term)
+    query = query.filter(
+        or_(
+            document.op("@@")(ts_query),
+            term_literal.op("<%")(College.name),
+            term_literal.op("<%")(College.location),
+        )
+    )
+    rank = func.ts_rank(document, ts_query) + func.greatest(
+        func.word_similarity(term_literal, College.name),
+        func.word_similarity(term_literal, func.coalesce(College.location, "")),
+    )
+    return query, rank
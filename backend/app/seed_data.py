@@ -1,6 +1,7 @@
 """
 Seed data script to populate the database with sample colleges and users
 Run this after setting up the database: python seed_data.py
+For production-sized load test data, use generate_data.py instead.
 """
 
 import sys
@@ -14,6 +15,8 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from database import SessionLocal, engine
 from models import Base, User, College, Review
 from auth import get_password_hash
+from facets import apply_college_facets
+from ratings import recompute_college_ratings
 
 
 def create_sample_data():
@@ -324,6 +327,7 @@ def create_sample_data():
                 db.query(College).filter(College.name == college.name).first()
             )
             if not existing_college:
+                apply_college_facets(college)
                 db.add(college)
 
         db.commit()
@@ -398,20 +402,7 @@ def create_sample_data():
 
         # Update college review counts and ratings
         print("Updating college statistics...")
-        colleges_to_update = db.query(College).all()
-        for college in colleges_to_update:
-            reviews_count = (
-                db.query(Review).filter(Review.college_id == college.id).count()
-            )
-            if reviews_count > 0:
-                avg_rating = (
-                    db.query(func.avg(Review.rating))
-                    .filter(Review.college_id == college.id)
-                    .scalar()
-                )
-                college.total_reviews = reviews_count
-                college.average_rating = round(avg_rating, 1) if avg_rating else 0.0
-
+        recompute_college_ratings(db)
         db.commit()
 
         print("✅ Sample data created successfully!")
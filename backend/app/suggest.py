@@ -0,0 +1,145 @@
+"""
+In-process prefix index for college autocomplete.
+
+The index is a sorted list of (token, college_id) pairs built from college
+names, cities and program names, searched with bisect. It is loaded once at
+startup, patched in place by the college write endpoints, and periodically
+rebuilt so that workers which did not see a write catch up. Lookups never touch
+the database.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from database import ReadSessionLocal
+from models import College
+
+logger = logging.getLogger(__name__)
+
+MAX_CANDIDATES = 500
+SUGGEST_REFRESH_SECONDS = float(os.getenv("SUGGEST_REFRESH_SECONDS", 300))
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def normalize(text: Optional[str]) -> str:
+    return " ".join(_WORD_RE.findall((text or "").lower()))
+
+
+def college_tokens(
+    name: Optional[str], city: Optional[str], programs: Optional[Iterable[str]]
+) -> Tuple[str, ...]:
+    words = set(normalize(name).split()) | set(normalize(city).split())
+    for program in programs or []:
+        words.update(normalize(program).split())
+    return tuple(sorted(words))
+
+
+class PrefixIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys: List[Tuple[str, int]] = []
+        self._names: Dict[int, Tuple[str, str]] = {}  # id -> (name, normalized)
+        self._tokens: Dict[int, Tuple[str, ...]] = {}
+
+    def __len__(self):
+        return len(self._names)
+
+    def rebuild(self, colleges: Iterable[Tuple[int, str, Optional[str], Optional[list]]]):
+        """Replace the index with (id, name, city, programs) rows."""
+        names, tokens, keys = {}, {}, []
+        for college_id, name, city, programs in colleges:
+            names[college_id] = (name, normalize(name))
+            tokens[college_id] = college_tokens(name, city, programs)
+            keys.extend((token, college_id) for token in tokens[college_id])
+        keys.sort()
+        with self._lock:
+            self._keys, self._names, self._tokens = keys, names, tokens
+
+    def upsert(self, college: College):
+        with self._lock:
+            self._remove(college.id)
+            self._names[college.id] = (college.name, normalize(college.name))
+            self._tokens[college.id] = college_tokens(
+                college.name, college.city, college.programs
+            )
+            for token in self._tokens[college.id]:
+                insort(self._keys, (token, college.id))
+
+    def remove(self, college_id: int):
+        with self._lock:
+            self._remove(college_id)
+
+    def _remove(self, college_id: int):
+        for token in self._tokens.pop(college_id, ()):
+            i = bisect_left(self._keys, (token, college_id))
+            if i < len(self._keys) and self._keys[i] == (token, college_id):
+                del self._keys[i]
+        self._names.pop(college_id, None)
+
+    def suggest(self, q: str, limit: int = 10) -> List[Tuple[int, str]]:
+        """
+        Colleges where every word of q prefixes one of their tokens. Names that
+        start with q rank first, then alphabetical.
+        """
+        words = normalize(q).split()
+        if not words:
+            return []
+        first, rest = words[0], words[1:]
+
+        with self._lock:
+            keys = self._keys
+            candidates = set()
+            i = bisect_left(keys, (first,))
+            while i < len(keys) and keys[i][0].startswith(first):
+                candidates.add(keys[i][1])
+                if len(candidates) >= MAX_CANDIDATES:
+                    break
+                i += 1
+            matches = [
+                (college_id,) + self._names[college_id]
+                for college_id in candidates
+                if all(
+                    any(token.startswith(word) for token in self._tokens[college_id])
+                    for word in rest
+                )
+            ]
+
+        phrase = " ".join(words)
+        matches.sort(key=lambda m: (not m[2].startswith(phrase), m[2]))
+        return [(college_id, name) for college_id, name, _ in matches[:limit]]
+
+
+college_index = PrefixIndex()
+
+
+def load_college_index(db: Session):
+    college_index.rebuild(
+        db.query(College.id, College.name, College.city, College.programs).all()
+    )
+
+
+def refresh_college_index():
+    db = ReadSessionLocal()
+    try:
+        load_college_index(db)
+    finally:
+        db.close()
+
+
+async def keep_college_index_fresh():
+    """Rebuild the index every SUGGEST_REFRESH_SECONDS (0 disables)."""
+    while SUGGEST_REFRESH_SECONDS > 0:
+        await asyncio.sleep(SUGGEST_REFRESH_SECONDS)
+        try:
+            await run_in_threadpool(refresh_college_index)
+        except Exception:
+            logger.exception("Failed to refresh the college suggest index")
@@ -0,0 +1,48 @@
+"""
+Version counters behind the review page ETags.
+
+Building a version from an aggregate over a college's reviews scans them on
+every request however cheap the response is. Instead, writes bump a counter
+row in content_versions inside their own transaction, and reads look the
+counter up by primary key. college_reviews_version_key(id) versions a
+college's review pages; review creates, edits and deletes and like count
+changes bump it.
+
+The counters live in the database, so every worker agrees on them and a read
+replica serves a version together with the rows it covers. A missing row
+reads as version 0.
+
+bump_versions() flushes the session first and bumps keys in sorted order, so
+the counter rows are the last locks a write takes and concurrent writers take
+them in the same order. Writers only share a row when they touch the same
+college's reviews.
+"""
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models import ContentVersion
+
+def college_reviews_version_key(college_id: int) -> str:
+    return f"college_reviews:{college_id}"
+
+
+def version_statement(key: str):
+    return select(ContentVersion.version).where(ContentVersion.key == key)
+
+
+def bump_statement(dialect_name: str, key: str):
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    return insert(ContentVersion).values(key=key, version=1).on_conflict_do_update(
+        index_elements=[ContentVersion.key],
+        set_={"version": ContentVersion.version + 1},
+    )
+
+
+def bump_versions(db: Session, *keys: str) -> None:
+    """Bump counters in the caller's transaction; the caller commits."""
+    db.flush()
+    dialect_name = db.get_bind().dialect.name
+    for key in sorted(set(keys)):
+        db.execute(bump_statement(dialect_name, key))
@@ -0,0 +1,58 @@
+"""
+Per-viewer flags for list responses.
+
+Responses carry is_saved_by_current_user / is_liked_by_current_user. Looking
+those up row by row costs one query per item, so these loaders answer a whole
+page with a single IN (...) query. The *_statement builders are shared with
+the async endpoints, as is liked_reviews_version_statement behind the
+per-viewer part of the review page ETags.
+"""
+
+from typing import Iterable, Optional, Set
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from models import ReviewLike, SavedCollege
+from principals import Principal
+
+
+def saved_college_ids_statement(user_id: int, college_ids: Set[int]):
+    return select(SavedCollege.college_id).where(
+        SavedCollege.user_id == user_id,
+        SavedCollege.college_id.in_(college_ids),
+    )
+
+
+def liked_review_ids_statement(user_id: int, review_ids: Set[int]):
+    return select(ReviewLike.review_id).where(
+        ReviewLike.user_id == user_id,
+        ReviewLike.review_id.in_(review_ids),
+    )
+
+
+def liked_reviews_version_statement(user_id: int):
+    """Changes whenever the user likes or unlikes a review."""
+    return select(func.count(ReviewLike.id), func.max(ReviewLike.id)).where(
+        ReviewLike.user_id == user_id
+    )
+
+
+def saved_college_ids(
+    db: Session, user: Optional[Principal], college_ids: Iterable[int]
+) -> Set[int]:
+    """Ids among college_ids that user has bookmarked."""
+    college_ids = set(college_ids)
+    if user is None or not college_ids:
+        return set()
+    return set(db.execute(saved_college_ids_statement(user.id, college_ids)).scalars())
+
+
+def liked_review_ids(
+    db: Session, user: Optional[Principal], review_ids: Iterable[int]
+) -> Set[int]:
+    """Ids among review_ids that user has liked."""
+    review_ids = set(review_ids)
+    if user is None or not review_ids:
+        return set()
+    return set(db.execute(liked_review_ids_statement(user.id, review_ids)).scalars())
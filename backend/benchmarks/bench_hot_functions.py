@@ -0,0 +1,170 @@
+"""
+Micro-benchmarks of the pure functions on the hot read paths, with baselines.
+
+Times the facet derivation that replaced in-Python metadata filtering, the
+weighted score, the response model construction and serialization done for
+every listing page, and the per-request metrics recording, on in-memory
+objects (no database round trips).
+Each case reports the best per-call time over --repeat timeit runs, which is
+the least noisy figure, and is compared with baselines/bench_hot_functions.json:
+the script exits 1 if any case got more than --threshold times slower.
+
+    python benchmarks/bench_hot_functions.py
+    python benchmarks/bench_hot_functions.py --save-baseline
+
+Baselines are only comparable on the machine and Python they were saved with.
+"""
+
+import argparse
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+import common
+from common import CITIES, NAME_WORDS, PROGRAMS
+
+PAGE_SIZE = 20
+
+
+def make_colleges(rng):
+    from models import College
+
+    colleges = []
+    for i in range(PAGE_SIZE):
+        city = rng.choice(CITIES)
+        metadata = {
+            "min_fee": rng.randint(50, 200) * 1000,
+            "max_fee": rng.randint(200, 800) * 1000,
+            "scholarships_available": rng.random() < 0.5,
+        }
+        if i % 2:
+            metadata["streams"] = ["Science", "Management"]
+        colleges.append(
+            College(
+                id=i + 1,
+                name=f"{city} {rng.choice(NAME_WORDS)} College {i}",
+                location=f"Ward {rng.randint(1, 32)}, {city}",
+                city=city,
+                country="Nepal",
+                affiliation=rng.choice(["TU", "KU", "PU", "NEB"]),
+                description="A college with a long description. " * 8,
+                images=[f"https://img.example/{i}/{n}.jpg" for n in range(3)],
+                programs=rng.sample(PROGRAMS, 3),
+                facilities=["Library", "Lab", "Canteen", "Sports"],
+                college_metadata=metadata,
+                average_rating=round(rng.uniform(1, 5), 1),
+                total_reviews=rng.randint(0, 500),
+                created_at=datetime(2024, 1, 1) + timedelta(days=i),
+            )
+        )
+    return colleges
+
+
+def make_reviews(college, rng):
+    from models import Review, User
+
+    reviews = []
+    for i in range(PAGE_SIZE):
+        user = User(id=i + 1, username=f"student{i}", email=f"student{i}@bench.local")
+        reviews.append(
+            Review(
+                id=i + 1,
+                college_id=college.id,
+                user_id=user.id,
+                user=user,
+                rating=rng.choice([3.0, 3.5, 4.0, 4.5, 5.0]),
+                title="Good faculty, crowded labs",
+                content="Teachers are helpful and the library is well stocked. " * 6,
+                program=rng.choice(PROGRAMS),
+                graduation_year="2023",
+                images=[],
+                is_verified=rng.random() < 0.2,
+                likes_count=rng.randint(0, 40),
+                created_at=datetime(2024, 6, 1) - timedelta(hours=i),
+            )
+        )
+    return reviews
+
+
+def cases():
+    from facets import derive_streams, facet_columns
+    from listing_cache import CachedListing, listing_response
+    from listings import college_list_response, college_response, college_reviews_response
+    from metrics import RequestMetrics
+    from principals import Principal
+    from querystats import QueryStats
+    from ratings import weighted_score
+
+    rng = random.Random(42)
+    colleges = make_colleges(rng)
+    college = colleges[1]
+    reviews = make_reviews(college, rng)
+    saved_ids = {c.id for c in colleges[::4]}
+    liked_ids = {r.id for r in reviews[::3]}
+    viewer = Principal(id=3, username="student2", is_active=True)
+    page = college_list_response(colleges, set(), 5000, 1, PAGE_SIZE)
+    metrics = RequestMetrics()
+    queries = QueryStats()
+    queries.observe("SELECT 1", 0.002)
+    cached = CachedListing(
+        body=page.model_dump_json().encode(),
+        digest="",
+        college_ids=frozenset(c.id for c in colleges),
+        response=page,
+    )
+
+    return {
+        "derive_streams (metadata)": lambda: derive_streams(
+            college.college_metadata, college.programs
+        ),
+        "derive_streams (programs)": lambda: derive_streams({}, colleges[0].programs),
+        "facet_columns": lambda: facet_columns(college.college_metadata),
+        "weighted_score": lambda: weighted_score(college.total_reviews, 4.2, 3.7),
+        "college_response": lambda: college_response(college, saved_ids),
+        "college page model": lambda: college_list_response(
+            colleges, saved_ids, 5000, 1, PAGE_SIZE
+        ),
+        "college page json": lambda: college_list_response(
+            colleges, saved_ids, 5000, 1, PAGE_SIZE
+        ).model_dump_json(),
+        "cached page, saved flags": lambda: listing_response(cached, saved_ids, {}),
+        "review page json": lambda: college_reviews_response(
+            college, reviews, liked_ids, viewer, 400, 1, PAGE_SIZE, None
+        ).model_dump_json(),
+        "request metrics observe": lambda: metrics.observe(
+            "GET", "/colleges", 200, 0.012, 4000, queries
+        ),
+    }
+
+
+def measure(fn, repeat):
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--threshold", type=float, default=1.5)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'case':<28}{'us/call':>12}")
+    for name, fn in cases().items():
+        results[name] = {"us_per_call": round(measure(fn, args.repeat), 3)}
+        print(f"{name:<28}{results[name]['us_per_call']:>12.2f}")
+
+    env = common.environment()
+    if args.save_baseline:
+        common.save_baseline("bench_hot_functions", results, env)
+        print(f"Saved {common.baseline_path('bench_hot_functions')}")
+        return
+    if common.check_baseline("bench_hot_functions", results, env, "us_per_call", args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Check that the admin endpoints turn away everyone but admins.
+
+Calls each endpoint in ADMIN_ENDPOINTS in-process three times: without a
+token, as a regular user and as an admin (ADMIN_USERNAMES is set for the
+run). The first two must be refused with 401 or 403 and the admin's call
+must succeed; anything else is reported and the script exits 1. Add new
+admin-only routes here.
+
+    DATABASE_URL=sqlite:////tmp/admin.db python benchmarks/check_admin_endpoints.py
+"""
+
+import os
+import sys
+
+import common  # noqa: F401  (puts the app on sys.path)
+
+ADMIN = "check-admin"
+USER = "check-user"
+
+# (method, path); bodiless calls that succeed without changing anything
+ADMIN_ENDPOINTS = [
+    ("GET", "/admin/stats"),
+    ("GET", "/admin/profiles"),
+    ("GET", "/admin/memory"),
+    ("GET", "/reviews/export"),
+    ("GET", "/reviews/export?format=csv"),
+    ("POST", "/colleges/import?format=ndjson"),
+]
+
+
+def ensure_users():
+    from database import SessionLocal
+    from models import User
+
+    db = SessionLocal()
+    try:
+        for username in (ADMIN, USER):
+            if db.query(User.id).filter(User.username == username).first() is None:
+                db.add(
+                    User(
+                        username=username,
+                        email=f"{username}@example.com",
+                        hashed_password="!",  # never logs in with a password
+                    )
+                )
+        db.commit()
+    finally:
+        db.close()
+
+
+def main():
+    # Read at import time, so set before main.py is loaded
+    os.environ["ADMIN_USERNAMES"] = ADMIN
+    from fastapi.testclient import TestClient
+
+    from auth import create_access_token
+    from main import app
+
+    ensure_users()
+    callers = [
+        ("anonymous", {}, False),
+        ("user", {"Authorization": f"Bearer {create_access_token({'sub': USER})}"}, False),
+        ("admin", {"Authorization": f"Bearer {create_access_token({'sub': ADMIN})}"}, True),
+    ]
+
+    failures = 0
+    client = TestClient(app)
+    print(f"{'endpoint':<40}" + "".join(f"{name:>11}" for name, _, _ in callers))
+    for method, path in ADMIN_ENDPOINTS:
+        statuses = []
+        for _, headers, allowed in callers:
+            status = client.request(method, path, headers=headers).status_code
+            ok = status < 300 if allowed else status in (401, 403)
+            failures += not ok
+            statuses.append(f"{status}{'' if ok else '!'}")
+        print(f"{method + ' ' + path:<40}" + "".join(f"{status:>11}" for status in statuses))
+
+    if failures:
+        print(f"{failures} call(s) got the wrong answer; '!' marks them")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
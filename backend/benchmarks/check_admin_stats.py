@@ -0,0 +1,72 @@
+"""
+Check that /admin/stats shows new data within ADMIN_STATS_REFRESH_SECONDS.
+
+Runs the app with a short refresh period and without its startup tasks, so
+no background refresher helps: the bound has to hold even when it stalls.
+Reads the stats as an admin, then registers a user, creates a college and
+reviews it through the API. After one period the totals must have grown by
+exactly that much; otherwise the script exits 1.
+
+    DATABASE_URL=sqlite:////tmp/admin.db python benchmarks/check_admin_stats.py
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+
+from check_admin_endpoints import ADMIN, ensure_users
+
+TOTALS = ("total_users", "total_colleges", "total_reviews")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--refresh-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    # Read at import time, so set before main.py is loaded
+    os.environ["ADMIN_USERNAMES"] = ADMIN
+    os.environ["ADMIN_STATS_REFRESH_SECONDS"] = str(args.refresh_seconds)
+    from fastapi.testclient import TestClient
+
+    from auth import create_access_token
+    from main import app
+
+    ensure_users()
+    admin = {"Authorization": f"Bearer {create_access_token({'sub': ADMIN})}"}
+    # Not entered as a context manager, so the startup tasks don't run
+    client = TestClient(app)
+
+    def totals():
+        response = client.get("/admin/stats", headers=admin)
+        response.raise_for_status()
+        return {name: response.json()[name] for name in TOTALS}
+
+    before = totals()
+    name = f"stats-{uuid.uuid4().hex[:8]}"
+    response = client.post(
+        "/auth/register",
+        json={"email": f"{name}@example.com", "username": name, "password": "check-stats"},
+    )
+    response.raise_for_status()
+    user = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    response = client.post("/colleges", json={"name": f"{name} College"}, headers=user)
+    response.raise_for_status()
+    review = {"college_id": response.json()["id"], "rating": 4, "title": "t", "content": "c"}
+    client.post("/reviews", json=review, headers=user).raise_for_status()
+
+    time.sleep(args.refresh_seconds)
+    after = totals()
+
+    expected = {name: before[name] + 1 for name in TOTALS}
+    for name in TOTALS:
+        print(f"{name:<16}{before[name]:>8}{after[name]:>8}  expected {expected[name]}")
+    if after != expected:
+        print(f"/admin/stats didn't catch up within {args.refresh_seconds:g}s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Check the SQL statement count of the list endpoints against their budgets.
+
+Calls each endpoint in BUDGETS in-process at two page sizes, with
+DB_QUERY_HEADERS on, and reads X-DB-Queries. A count above the endpoint's
+budget, or one that grows with the page size (an N+1: a query per row), is
+reported and the script exits 1, as is a list that comes back with fewer
+than two rows, since then the per-row path went untested. Lower a budget when an endpoint gets
+cheaper; raising one should come with a reason.
+
+The database must hold a dataset from generate_data.py; an empty one is
+seeded with a small one first. The viewer is the user with the most reviews
+among those who have also saved colleges and liked reviews, so the profile
+lists and the per-row flags (liked, saved, owned) all have rows to load.
+
+    DATABASE_URL=sqlite:////tmp/budgets.db python benchmarks/check_query_budgets.py
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+import common
+
+# (path, signed in, max statements); {college} is the most reviewed college
+BUDGETS = [
+    ("/colleges", False, 2),
+    ("/colleges", True, 3),
+    ("/colleges?sort=weighted&city=Kathmandu", True, 3),
+    ("/colleges/{college}", True, 2),
+    ("/colleges/{college}/reviews", False, 4),
+    ("/colleges/{college}/reviews", True, 6),
+    ("/profile/reviews", True, 2),
+    ("/profile/liked-reviews", True, 2),
+    ("/profile/saved-colleges", True, 2),
+    ("/reviews", False, 2),
+]
+PAGE_SIZES = (5, 50)
+# Where the list endpoints' responses keep their rows
+LIST_KEYS = ("colleges", "reviews", "saved_colleges")
+
+
+def setup(args):
+    from sqlalchemy import desc, func
+
+    from auth import create_access_token
+    from database import SessionLocal
+    from main import app  # noqa: F401  (creates the tables)
+    from models import College, Review, ReviewLike, SavedCollege, User
+
+    common.ensure_dataset(args.seed_colleges, args.seed_users, args.seed_reviews)
+    db = SessionLocal()
+    try:
+        college_id = (
+            db.query(College.id).order_by(desc(College.total_reviews)).limit(1).scalar()
+        )
+        saves = (
+            db.query(func.count(SavedCollege.id))
+            .filter(SavedCollege.user_id == User.id)
+            .scalar_subquery()
+        )
+        likes = (
+            db.query(func.count(ReviewLike.id))
+            .filter(ReviewLike.user_id == User.id)
+            .scalar_subquery()
+        )
+        username = (
+            db.query(User.username)
+            .join(Review, Review.user_id == User.id)
+            .filter(saves > 1, likes > 1)
+            .group_by(User.id, User.username)
+            .having(func.count(Review.id) > 1)
+            .order_by(desc(func.count(Review.id)))
+            .limit(1)
+            .scalar()
+        )
+        if username is None:
+            sys.exit("No user has several reviews, saves and likes to check with")
+        return college_id, create_access_token({"sub": username})
+    finally:
+        db.close()
+
+
+async def measure(college_id, token):
+    import httpx
+
+    from main import app
+
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://budgets") as client:
+        for path, signed_in, budget in BUDGETS:
+            path = path.format(college=college_id)
+            counts = []
+            # Warm the per-process caches (principals, the rating prior) first
+            await client.get(path, headers=headers if signed_in else {})
+            for limit in PAGE_SIZES:
+                separator = "&" if "?" in path else "?"
+                response = await client.get(
+                    f"{path}{separator}limit={limit}", headers=headers if signed_in else {}
+                )
+                response.raise_for_status()
+                counts.append(int(response.headers["X-DB-Queries"]))
+            # Rows in the largest page; None for single-resource endpoints
+            body = response.json()
+            rows = next((len(body[key]) for key in LIST_KEYS if key in body), None)
+            yield path, signed_in, budget, counts, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seed-colleges", type=int, default=200)
+    parser.add_argument("--seed-users", type=int, default=2000)
+    parser.add_argument("--seed-reviews", type=int, default=10000)
+    args = parser.parse_args()
+
+    # Read at import time, so set before main.py is loaded; the listing cache
+    # would answer repeat pages without any statements
+    os.environ["DB_QUERY_HEADERS"] = "1"
+    os.environ["LISTING_CACHE_TTL_SECONDS"] = "0"
+    college_id, token = setup(args)
+
+    async def check():
+        failures = 0
+        sizes = " ".join(f"limit={size:<3}" for size in PAGE_SIZES)
+        print(f"{'endpoint':<48}{'viewer':<8}{sizes:>20}{'budget':>8}")
+        async for path, signed_in, budget, counts, rows in measure(college_id, token):
+            problems = []
+            if rows is not None and rows < 2:
+                problems.append(f"only {rows} row(s) returned")
+            if max(counts) > budget:
+                problems.append("over budget")
+            if len(set(counts)) > 1:
+                problems.append("grows with page size")
+            failures += bool(problems)
+            print(
+                f"{path:<48}{'auth' if signed_in else 'anon':<8}"
+                f"{' '.join(f'{count:<9}' for count in counts):>20}{budget:>8}"
+                f"  {', '.join(problems)}"
+            )
+        return failures
+
+    failures = asyncio.run(check())
+    if failures:
+        print(f"{failures} endpoint(s) failed their query budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Shared helpers for the benchmark scripts in this directory.
+
+The scripts import the app modules the same way seed_data.py does, so they run
+against whatever DATABASE_URL points at. Use a throwaway database: most of them
+create and delete data.
+"""
+
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(BENCH_DIR, "..", "app")
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+sys.path.append(APP_DIR)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def time_calls(fn, repeat=20, warmup=3):
+    """Run fn repeatedly and return per-call latencies in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summarize(samples):
+    return {
+        "p50": statistics.median(samples) if samples else 0.0,
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+    }
+
+
+def environment(database=None):
+    """What a baseline was measured on; numbers only compare on like machines."""
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "database": database,
+    }
+
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def load_baseline(name):
+    try:
+        with open(baseline_path(name)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(name, results, env):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    with open(baseline_path(name), "w") as f:
+        json.dump({"environment": env, "results": results}, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def check_baseline(name, results, env, metric, threshold):
+    """
+    Compare results[case][metric] (lower is better) with the stored baseline
+    and print the cases that got more than threshold times slower. Returns
+    the number of regressions; cases missing on either side are skipped.
+    """
+    baseline = load_baseline(name)
+    if baseline is None:
+        print(f"No baseline at {baseline_path(name)}; run with --save-baseline")
+        return 0
+    if baseline["environment"] != env:
+        print(f"Baseline measured on {baseline['environment']}, this run on {env}")
+    regressions = 0
+    for case, stats in results.items():
+        before = baseline["results"].get(case, {}).get(metric)
+        if not before:
+            continue
+        ratio = stats[metric] / before
+        if ratio > threshold:
+            regressions += 1
+            print(f"REGRESSION {case}: {metric} {before:.4g} -> {stats[metric]:.4g} ({ratio:.2f}x)")
+    print(f"{regressions} regression(s) beyond {threshold:.2f}x the baseline {metric}")
+    return regressions
+
+
+CITIES = ["Kathmandu", "Lalitpur", "Bhaktapur", "Pokhara", "Biratnagar", "Butwal", "Dharan"]
+PROGRAMS = ["+2 Science", "+2 Management", "+2 Humanities", "BBA", "BBS", "BSc CSIT", "BE Civil"]
+NAME_WORDS = ["Model", "Global", "Himalayan", "National", "Capital", "Everest", "Valley", "Public"]
+
+
+def grow_catalog(db, size, rng=None):
+    """
+    Bulk insert synthetic colleges until the catalog holds size rows. Review
+    counts are heavy-tailed so a few colleges dominate, like production.
+    """
+    from sqlalchemy import insert
+    from sqlalchemy.sql import func
+
+    from models import College
+    from ratings import rescore_catalog
+
+    rng = rng or random.Random(42)
+    current = db.query(func.count(College.id)).scalar()
+    rows = []
+    for i in range(current, size):
+        city = rng.choice(CITIES)
+        total_reviews = int(rng.paretovariate(1.2)) - 1 if rng.random() < 0.6 else 0
+        rows.append(
+            {
+                "name": f"{city} {rng.choice(NAME_WORDS)} College {i}",
+                "location": f"Ward {rng.randint(1, 32)}, {city}",
+                "city": city,
+                "country": "Nepal",
+                "affiliation": rng.choice(["TU", "KU", "PU", "NEB"]),
+                "programs": rng.sample(PROGRAMS, 3),
+                "college_metadata": {},
+                "total_reviews": total_reviews,
+                "average_rating": round(rng.uniform(1, 5), 1) if total_reviews else 0.0,
+            }
+        )
+        if len(rows) == 5000:
+            db.execute(insert(College), rows)
+            rows = []
+    if rows:
+        db.execute(insert(College), rows)
+    rescore_catalog(db)
+    db.commit()
+
+
+def ensure_dataset(colleges, users, reviews, password="loadtest"):
+    """Seed an empty database with generate_data.py; leave a populated one alone."""
+    from argparse import Namespace
+
+    from database import SessionLocal
+    from models import Review
+
+    db = SessionLocal()
+    try:
+        if db.query(Review.id).first() is not None:
+            return
+    finally:
+        db.close()
+
+    import generate_data
+
+    generate_data.generate(
+        Namespace(
+            colleges=colleges,
+            users=users,
+            reviews=reviews,
+            likes_per_review=3.0,
+            saves_per_user=2.0,
+            days=365,
+            batch_size=5000,
+            password=password,
+            seed=42,
+        )
+    )
+
+
+def grow_table(db, model, size, make_row):
+    """Bulk insert make_row(i) rows until the table holds size rows."""
+    from sqlalchemy import insert
+    from sqlalchemy.sql import func
+
+    current = db.query(func.count(model.id)).scalar()
+    rows = []
+    for i in range(current, size):
+        rows.append(make_row(i))
+        if len(rows) == 10000:
+            db.execute(insert(model), rows)
+            rows = []
+    if rows:
+        db.execute(insert(model), rows)
+    db.commit()